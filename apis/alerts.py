@@ -1,9 +1,20 @@
-import requests
-import json
+import asyncio
 from datetime import datetime, timezone
-from config import MOOGSOFT_API_KEY
+from apis.columns import GroupCounters, Interner, both, column, epoch_seconds, in_window, pages, take
+from apis.decoding import Decoder
+from apis.fields import ALERT_SUMMARY_FIELDS, FieldSpec
+from apis.pagination import iter_search_after, iter_search_after_pages, aiter_search_after_pages
+from apis.timestamps import to_epoch_seconds
+from checkpoints import closed_days, load_or_build, prune_checkpoints
+from store import RecordStore, store_covers, store_enabled, sync_pages, sync_pages_async
+from config import MOOGSOFT_BASE_URL
 
-ALERTS_API_URL = "https://api.moogsoft.ai/v1/alerts"
+ALERTS_API_URL = f"{MOOGSOFT_BASE_URL}/v1/alerts"
+MOOGSOFT_TIME_FORMATS = ("%Y/%m/%d %I:%M:%S %p",)
+STORE_DATASET = "alerts"
+
+# Decodes only the fields AlertColumns reads when msgspec is installed
+ALERTS_PAGE_DECODER = Decoder(ALERT_SUMMARY_FIELDS, "Alerts")
 
 def epoch_to_moogsoft_format(epoch_time: int) -> str:
     """
@@ -11,92 +22,273 @@ def epoch_to_moogsoft_format(epoch_time: int) -> str:
     """
     return datetime.fromtimestamp(epoch_time, tz=timezone.utc).strftime("%Y/%m/%d %I:%M:%S %p")
 
+def alerts_payload(start_epoch: int) -> dict:
+    """
+    Build the alerts search payload for alerts with first_event_time >= start_epoch.
+    """
+    return {
+        "filter": f"first_event_time >= \"{epoch_to_moogsoft_format(start_epoch)}\"",
+        "limit": 5000,
+        "fields": ALERT_SUMMARY_FIELDS.payload_fields()
+    }
+
+def iter_alerts_since(start_epoch: int, fields: FieldSpec = None):
+    """
+    Yield alerts from Moogsoft API starting from start_epoch, one page at a time.
+    Pass fields to trim alerts that are kept beyond their page.
+    """
+    return iter_search_after(ALERTS_API_URL, alerts_payload(start_epoch), endpoint="alerts", fields=fields,
+                             decode=ALERTS_PAGE_DECODER)
+
 def fetch_alerts_since(start_epoch: int) -> list:
     """
     Fetch all alerts from Moogsoft API starting from start_epoch.
     Handles pagination until no results are returned.
     """
-    alerts = []
-    headers = {
-        "apikey": MOOGSOFT_API_KEY,
-        "Content-Type": "application/json"
-    }
+    return list(iter_alerts_since(start_epoch, fields=ALERT_SUMMARY_FIELDS))
 
-    alerts_payload = {
-        "filter": f"first_event_time >= \"{epoch_to_moogsoft_format(start_epoch)}\"",
-        "limit": 5000,
-        "fields": [
-            "manager",
-            "event_count",
-            "incidents",
-            "tags",
-            "check",
-            "first_event_time"
-        ]
-    }
+def alert_time(alert: dict) -> float | None:
+    return to_epoch_seconds(alert.get("first_event_time"), MOOGSOFT_TIME_FORMATS)
+
+class AlertColumns:
+    """
+    One page of alerts in columnar form, with the manager and Nagios
+    instance of every row interned.
 
-    while True:
-        response = requests.post(ALERTS_API_URL, headers=headers, data=json.dumps(alerts_payload), timeout=30)
-        response.raise_for_status()
-        data = response.json()
+    Columns:
+        manager: Manager code.
+        events: event_count.
+        no_incident_events: event_count if the alert has no incidents, else 0.
+        instance: tags.instance code for Nagios alerts that have one, else -1.
+        time: first_event_time in epoch seconds.
+    """
 
-        results = data.get("data", {}).get("result", [])
-        if not results:
-            break
+    def __init__(self, alerts_page: list, managers: Interner, instances: Interner, default_time: float):
+        manager_names = [alert.get("manager", "Unknown") for alert in alerts_page]
+        events = [alert.get("event_count", 0) for alert in alerts_page]
 
-        alerts.extend(results)
+        # Special case: Nagios tags.instance breakdown
+        instance_codes = [-1] * len(alerts_page)
+        for row, manager in enumerate(manager_names):
+            if manager == "Nagios":
+                tags = alerts_page[row].get("tags", {})
+                if "instance" in tags:
+                    instance_codes[row] = instances.code(tags["instance"])
 
-        search_after = data.get("data", {}).get("search_after")
-        if not search_after:
-            break
+        self.manager = column(managers.codes_of(manager_names))
+        self.events = column(events)
+        self.no_incident_events = column([
+            0 if alert.get("incidents", []) else event_count
+            for alert, event_count in zip(alerts_page, events)
+        ])
+        self.instance = column(instance_codes)
+        self.has_instance = column([code >= 0 for code in instance_codes], bool)
+        self.time = epoch_seconds(
+            [alert.get("first_event_time") for alert in alerts_page],
+            lambda value: to_epoch_seconds(value, MOOGSOFT_TIME_FORMATS),
+            default_time
+        )
 
-        alerts_payload["search_after"] = search_after
+class AlertReducer:
+    """
+    Incrementally summarize alerts into per-window per-manager and Nagios counters.
 
-    return alerts
+    Every page is turned into AlertColumns and counted with one group-by per
+    window, instead of updating nested dicts row by row.
 
-def aggregate_alerts(this_month_epoch: int, last_24h_epoch: int) -> dict:
+    Args:
+        windows: { window_name: start epoch seconds, or (start, end) }
+        default_time: Time assumed for alerts without a parseable first_event_time.
     """
-    Aggregate alert data per manager and return summary stats.
-    Includes special case for Nagios tag instance breakdown.
+
+    def __init__(self, windows: dict, default_time: float):
+        self.windows = windows
+        self.default_time = default_time
+        self.managers = Interner()
+        self.instances = Interner()
+        self.per_manager = {name: GroupCounters(("alerts", "events", "no_incident_events")) for name in windows}
+        self.nagios = {name: GroupCounters(("events",)) for name in windows}
+
+    def add(self, alert: dict) -> None:
+        self.add_page([alert])
+
+    def add_page(self, alerts_page: list) -> None:
+        columns = AlertColumns(alerts_page, self.managers, self.instances, self.default_time)
+
+        for name, window in self.windows.items():
+            selected = in_window(columns.time, window)
+            managers, events, no_incident_events = take(
+                selected, columns.manager, columns.events, columns.no_incident_events
+            )
+            self.per_manager[name].add(
+                managers, len(self.managers),
+                alerts=None, events=events, no_incident_events=no_incident_events
+            )
+
+            instances, instance_events = take(both(selected, columns.has_instance), columns.instance, columns.events)
+            self.nagios[name].add(instances, len(self.instances), events=instance_events)
+
+    def result(self) -> dict:
+        """
+        Returns:
+            dict: {
+                "per_manager": { window_name: { manager: {...} } },
+                "nagios": { window_name: { instance: int } }
+            }
+        """
+        return {
+            "per_manager": {
+                name: dict(counters.items(self.managers.values))
+                for name, counters in self.per_manager.items()
+            },
+            "nagios": {
+                name: {instance: counts["events"] for instance, counts in counters.items(self.instances.values)}
+                for name, counters in self.nagios.items()
+            }
+        }
+
+def reduce_alerts(alerts_iter, windows: dict, default_time: float) -> dict:
     """
-    # Fetch alerts for this month and last 24h
-    month_alerts = fetch_alerts_since(this_month_epoch)
-    day_alerts = fetch_alerts_since(last_24h_epoch)
+    Consume an alert stream (e.g. iter_alerts_since()) and summarize it for
+    every window. See AlertReducer for the arguments and result.
+    """
+    reducer = AlertReducer(windows, default_time)
+    for alerts_page in pages(alerts_iter):
+        reducer.add_page(alerts_page)
+    return reducer.result()
 
-    def summarize(alerts_list):
-        per_manager = {}
-        nagios_tags = {}
+def sync_store(record_store: RecordStore, start_epoch: float, full: bool = False) -> None:
+    """
+    Bring the local store up to date for alerts since start_epoch. Only the
+    alerts past the store's watermark (minus the overlap) are fetched unless
+    full is set.
+    """
+    delta_start = start_epoch if full else record_store.delta_start(STORE_DATASET, start_epoch)
+    pages = iter_search_after_pages(ALERTS_API_URL, alerts_payload(delta_start), endpoint="alerts",
+                                    fields=ALERT_SUMMARY_FIELDS, decode=ALERTS_PAGE_DECODER)
+    sync_pages(record_store, STORE_DATASET, pages, "alert_id", alert_time, delta_start)
+
+def resync_store(record_store: RecordStore, start_epoch: float) -> None:
+    sync_store(record_store, start_epoch, full=True)
 
-        for alert in alerts_list:
-            manager = alert.get("manager", "Unknown")
-            event_count = alert.get("event_count", 0)
-            incidents = alert.get("incidents", [])
-            tags = alert.get("tags", {})
+def build_checkpoint(record_store: RecordStore, start: float, end: float) -> dict:
+    """
+    Partial aggregate of the stored alerts with start <= first_event_time < end.
+    """
+    result = reduce_alerts(record_store.iter_records(STORE_DATASET, start, end), {"day": start}, default_time=start)
+    return {
+        "per_manager": result["per_manager"]["day"],
+        "nagios": result["nagios"]["day"]
+    }
 
-            # Manager aggregation
+def merge_alert_partials(partials: list) -> dict:
+    """
+    Add up partial aggregates ({"per_manager": ..., "nagios": ...}) of disjoint time ranges.
+    """
+    per_manager = {}
+    nagios = {}
+    for partial in partials:
+        for manager, counts in partial["per_manager"].items():
             mgr_data = per_manager.setdefault(manager, {"alerts": 0, "events": 0, "no_incident_events": 0})
-            mgr_data["alerts"] += 1
-            mgr_data["events"] += event_count
-            if not incidents:
-                mgr_data["no_incident_events"] += event_count
+            for key, value in counts.items():
+                mgr_data[key] = mgr_data.get(key, 0) + value
+        for instance, count in partial["nagios"].items():
+            nagios[instance] = nagios.get(instance, 0) + count
+    return {
+        "per_manager": per_manager,
+        "nagios": nagios
+    }
+
+def summarize_from_store(record_store: RecordStore, windows: dict, default_time: float) -> dict:
+    """
+    Summarize the stored alerts for the this_month / last_24h windows.
 
-            # Special case: Nagios tags.instance breakdown
-            if manager == "Nagios" and "instance" in tags:
-                instance = tags["instance"]
-                nagios_tags[instance] = nagios_tags.get(instance, 0) + event_count
+    Closed days of the month come from their daily checkpoints (built on first
+    use); only the still-open tail of the month and the last 24h are reduced
+    from raw records, so the cost does not grow over the month.
+    """
+    days = closed_days(record_store, STORE_DATASET, windows["this_month"])
+    month_partials = load_or_build(
+        record_store, STORE_DATASET, days,
+        lambda start, end: build_checkpoint(record_store, start, end)
+    )
+    prune_checkpoints(record_store, STORE_DATASET)
+    if days and days[0][1] > windows["this_month"]:
+        # Month start is not a day boundary: reduce the leading partial day raw
+        month_partials.insert(0, build_checkpoint(record_store, windows["this_month"], days[0][1]))
 
-        return per_manager, nagios_tags
+    open_windows = dict(windows, this_month=days[-1][2] if days else windows["this_month"])
+    records = record_store.iter_records(STORE_DATASET, min(open_windows.values()))
+    result = reduce_alerts(records, open_windows, default_time=default_time)
 
-    month_summary, month_nagios = summarize(month_alerts)
-    day_summary, day_nagios = summarize(day_alerts)
+    month = merge_alert_partials(month_partials + [{
+        "per_manager": result["per_manager"]["this_month"],
+        "nagios": result["nagios"]["this_month"]
+    }])
+    result["per_manager"]["this_month"] = month["per_manager"]
+    result["nagios"]["this_month"] = month["nagios"]
+    return result
 
-    return {
-        "per_manager": {
-            "this_month": month_summary,
-            "last_24h": day_summary
-        },
-        "nagios": {
-            "this_month": month_nagios,
-            "last_24h": day_nagios
-        }
+def aggregate_alerts(this_month_epoch: int, last_24h_epoch: int) -> dict:
+    """
+    Aggregate alert data per manager and return summary stats.
+    Includes special case for Nagios tag instance breakdown.
+
+    Alerts are fetched once from the earliest window start and bucketed
+    into every window their first_event_time falls into.
+    """
+    windows = {
+        "this_month": this_month_epoch,
+        "last_24h": last_24h_epoch
     }
+    fetch_start = min(windows.values())
+
+    # The server already filtered on first_event_time, so an alert without
+    # a parseable time is at least as new as the fetch start
+    if store_enabled():
+        with RecordStore() as record_store:
+            sync_store(record_store, fetch_start)
+            return summarize_from_store(record_store, windows, default_time=fetch_start)
+    return reduce_alerts(iter_alerts_since(fetch_start), windows, default_time=fetch_start)
+
+def aggregate_alert_windows(windows: dict) -> dict:
+    """
+    Reduce alerts for arbitrary { window_name: (start, end) } windows in one
+    pass, e.g. the windows of several backfilled reports. Records are read
+    from the store when it is enabled and covers the earliest window start
+    (store_covers), else streamed from the API, once from that start.
+    """
+    fetch_start = min(start for start, _ in windows.values())
+    # Windows reaching past the store's retention are streamed from the API
+    if store_covers(fetch_start):
+        with RecordStore() as record_store:
+            sync_store(record_store, fetch_start)
+            records = record_store.iter_records(STORE_DATASET, fetch_start, max(end for _, end in windows.values()))
+            return reduce_alerts(records, windows, default_time=fetch_start)
+    return reduce_alerts(iter_alerts_since(fetch_start), windows, default_time=fetch_start)
+
+async def aggregate_alerts_async(this_month_epoch: int, last_24h_epoch: int) -> dict:
+    """
+    Async variant of aggregate_alerts.
+    """
+    windows = {
+        "this_month": this_month_epoch,
+        "last_24h": last_24h_epoch
+    }
+    fetch_start = min(windows.values())
+
+    if store_enabled():
+        with RecordStore() as record_store:
+            delta_start = record_store.delta_start(STORE_DATASET, fetch_start)
+            pages = aiter_search_after_pages(ALERTS_API_URL, alerts_payload(delta_start), endpoint="alerts",
+                                             fields=ALERT_SUMMARY_FIELDS, decode=ALERTS_PAGE_DECODER)
+            await sync_pages_async(record_store, STORE_DATASET, pages, "alert_id", alert_time, delta_start)
+            # Reading and reducing up to a month of records (and building missing
+            # checkpoints) runs on a worker thread, off the event loop
+            return await asyncio.to_thread(summarize_from_store, record_store, windows, default_time=fetch_start)
+
+    reducer = AlertReducer(windows, default_time=fetch_start)
+    async for page in aiter_search_after_pages(ALERTS_API_URL, alerts_payload(fetch_start), endpoint="alerts",
+                                               decode=ALERTS_PAGE_DECODER):
+        reducer.add_page(page)
+    return reducer.result()
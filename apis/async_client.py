@@ -0,0 +1,147 @@
+import asyncio
+import time
+from typing import Mapping, NamedTuple
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for the async engine
+    aiohttp = None
+
+import telemetry
+from apis import decoding
+from apis.client import (
+    RETRY_STATUSES, ENDPOINT_TIMEOUTS, DEFAULT_TIMEOUT,
+    backoff_delay, parse_retry_after, _past_deadline
+)
+from config import MOOGSOFT_API_KEY, HTTP_POOL_SIZE, HTTP_MAX_RETRIES, ASYNC_MAX_IN_FLIGHT
+
+_session = None
+_in_flight = None
+
+
+class AsyncHTTPError(RuntimeError):
+    """
+    Raised for non-2xx responses, mirroring requests' raise_for_status().
+    """
+    def __init__(self, status: int, url: str):
+        super().__init__(f"{status} Error for url: {url}")
+        self.status = status
+        self.url = url
+
+
+def get_session() -> "aiohttp.ClientSession":
+    """
+    Return the aiohttp session of the running event loop, creating it on first use.
+    """
+    global _session, _in_flight
+    if aiohttp is None:
+        raise RuntimeError("The async engine requires aiohttp: pip install aiohttp")
+
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE),
+            # aiohttp rejects None header values, requests silently drops them
+            headers={k: v for k, v in {
+                "apikey": MOOGSOFT_API_KEY,
+                "Content-Type": "application/json"
+            }.items() if v is not None}
+        )
+        # Global cap on requests in flight across every section
+        _in_flight = asyncio.Semaphore(ASYNC_MAX_IN_FLIGHT)
+    return _session
+
+
+async def close_session() -> None:
+    global _session, _in_flight
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _in_flight = None
+
+
+class AsyncResponse(NamedTuple):
+    status: int
+    headers: Mapping  # case-insensitive, like requests' response.headers
+    body: bytes
+
+
+async def request(method: str, url: str, endpoint: str = None, timeout: float = None,
+                  deadline: float = None, **kwargs) -> AsyncResponse:
+    """
+    Async counterpart of client.request().
+
+    Retries connection errors, 429 and 5xx with the same backoff policy as
+    the sync client, and honours the same per-endpoint timeouts and deadline.
+
+    Returns:
+        AsyncResponse: Status, headers and body of the final response.
+
+    Raises:
+        AsyncHTTPError: For a non-2xx final response (304 is returned).
+        aiohttp.ClientError / asyncio.TimeoutError: If the connection keeps failing.
+    """
+    if timeout is None:
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    session = get_session()
+    give_up_at = time.monotonic() + deadline if deadline is not None else None
+    t0 = time.perf_counter()
+
+    attempt = 0
+    status = None
+    headers = {}
+    body = b""
+    try:
+        while True:
+            attempt_timeout = timeout
+            if give_up_at is not None:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Deadline of {deadline}s exceeded for {method} {url}")
+                attempt_timeout = min(timeout, remaining)
+
+            status, body = None, b""
+            try:
+                async with _in_flight:
+                    async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=attempt_timeout),
+                                               **kwargs) as response:
+                        status = response.status
+                        headers = response.headers
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = backoff_delay(attempt)
+                if attempt >= HTTP_MAX_RETRIES or _past_deadline(give_up_at, delay):
+                    raise
+                print(f"Retrying {method} {url} in {delay:.1f}s after error: {e!r}")
+            else:
+                if status not in RETRY_STATUSES or attempt >= HTTP_MAX_RETRIES:
+                    break
+                delay = backoff_delay(attempt, retry_after)
+                if _past_deadline(give_up_at, delay):
+                    break
+                print(f"Retrying {method} {url} in {delay:.1f}s after HTTP {status}")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+    finally:
+        telemetry.record_call(method, url, endpoint, status=status, elapsed=time.perf_counter() - t0,
+                              size=len(body), retries=attempt)
+
+    if status >= 400:
+        raise AsyncHTTPError(status, url)
+    return AsyncResponse(status, headers, body)
+
+async def request_json(method: str, url: str, endpoint: str = None, decode=None, **kwargs):
+    """
+    request() and decode the JSON body with decode (e.g. a decoding.Decoder),
+    defaulting to decoding.loads.
+    """
+    response = await request(method, url, endpoint=endpoint, **kwargs)
+    return (decode or decoding.loads)(response.body)
+
+async def get_json(url: str, endpoint: str = None, **kwargs):
+    return await request_json("GET", url, endpoint=endpoint, **kwargs)
+
+
+async def post_json(url: str, endpoint: str = None, **kwargs):
+    return await request_json("POST", url, endpoint=endpoint, **kwargs)
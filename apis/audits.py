@@ -1,18 +1,37 @@
-import requests
-from config import MOOGSOFT_API_KEY
+import asyncio
+from apis import client, async_client
+from apis.fanout import fan_out
+from config import AUDITS_GROUPED_QUERY, MOOGSOFT_BASE_URL
 
-AUDIT_API_URL = "https://api.moogsoft.ai/v1/audits"
+AUDIT_API_URL = f"{MOOGSOFT_BASE_URL}/v1/audits"
 AUDIT_SERVICES = [
     "ums-apikey", "ums-sso", "ums-role", "maintenance-windows",
     "catalogs", "workflows", "correlation-engine", "correlation-engine-webserver",
     "webhooks", "notification-policies", "byoapi"
 ]
 
+def audit_params(service: str | None, start: int, end: int) -> dict:
+    """
+    Query parameters of an audits request; service None queries every service.
+    """
+    params = {
+        "startTime": start,
+        "endTime": end
+    }
+    if service is not None:
+        params["serviceName"] = service
+    return params
+
 def fetch_audit_counts(start: int, end: int) -> dict:
     """
     Fetch audit change counts for specified services from Moogsoft API
     in the given time range (epoch milliseconds).
 
+    Every service is queried concurrently. With AUDITS_GROUPED_QUERY, one
+    unfiltered query is tried first and its records are counted per service;
+    the per-service queries are still made unless its total count shows it
+    carries every record (grouped_audit_counts).
+
     Args:
         start (int): Start time in epoch milliseconds.
         end (int): End time in epoch milliseconds.
@@ -23,37 +42,92 @@ def fetch_audit_counts(start: int, end: int) -> dict:
             "ums-sso": int,
             ...
         }
+        A service whose request failed maps to None rather than 0.
     """
-    headers = {
-        "apikey": MOOGSOFT_API_KEY,
-        "Content-Type": "application/json"
-    }
-
-    result = {}
+    if AUDITS_GROUPED_QUERY:
+        try:
+            response = client.get(AUDIT_API_URL, endpoint="audits", params=audit_params(None, start, end))
+            response.raise_for_status()
+            grouped = grouped_audit_counts(response.json())
+        except Exception as e:
+            print(f"Grouped audits query failed, querying per service: {e}")
+            grouped = None
+        if grouped is not None:
+            return grouped
 
-    for service in AUDIT_SERVICES:
+    def fetch(service):
         try:
-            response = requests.get(
+            response = client.get(
                 AUDIT_API_URL,
-                headers=headers,
-                params={
-                    "serviceName": service,
-                    "startTime": start,
-                    "endTime": end
-                },
-                timeout=15
+                endpoint="audits",
+                params=audit_params(service, start, end)
             )
             response.raise_for_status()
-            data = response.json()
+            return audit_count(response.json())
+        except Exception as e:
+            print(f"Error fetching audits for {service}: {e}")
+            return None
+
+    return dict(zip(AUDIT_SERVICES, fan_out(fetch, AUDIT_SERVICES, len(AUDIT_SERVICES))))
+
+async def fetch_audit_counts_async(start: int, end: int) -> dict:
+    """
+    Async variant of fetch_audit_counts.
+    """
+    if AUDITS_GROUPED_QUERY:
+        try:
+            grouped = grouped_audit_counts(await async_client.get_json(
+                AUDIT_API_URL, endpoint="audits", params=audit_params(None, start, end)
+            ))
+        except Exception as e:
+            print(f"Grouped audits query failed, querying per service: {e}")
+            grouped = None
+        if grouped is not None:
+            return grouped
+
+    async def fetch(service):
+        try:
+            data = await async_client.get_json(
+                AUDIT_API_URL,
+                endpoint="audits",
+                params=audit_params(service, start, end)
+            )
+            return audit_count(data)
+        except Exception as e:
+            print(f"Error fetching audits for {service}: {e}")
+            return None
 
-            if data.get("status") != "success":
-                result[service] = 0
-                continue
+    counts = await asyncio.gather(*(fetch(service) for service in AUDIT_SERVICES))
+    return dict(zip(AUDIT_SERVICES, counts))
 
-            count = data.get("data", {}).get("count", 0)
-            result[service] = count
+def audit_count(data: dict) -> int | None:
+    """
+    Count of a per-service response, or None if the API did not report success.
+    """
+    if data.get("status") != "success":
+        return None
+    return data.get("data", {}).get("count", 0)
+
+def grouped_audit_counts(data: dict) -> dict | None:
+    """
+    Per-service counts of an unfiltered audits response, counted from the
+    serviceName of its records.
 
-        except Exception:
-            result[service] = 0
+    Returns:
+        dict: { service: int } for every AUDIT_SERVICES entry, or None unless
+        the response states its total count and carries that many records.
+    """
+    if data.get("status") != "success":
+        return None
+    body = data.get("data") or {}
+    records = body.get("result")
+    total = body.get("count")
+    if not isinstance(records, list) or isinstance(total, bool) or not isinstance(total, int) or len(records) < total:
+        return None
 
-    return result
+    counts = dict.fromkeys(AUDIT_SERVICES, 0)
+    for record in records:
+        service = record.get("serviceName")
+        if service in counts:
+            counts[service] += 1
+    return counts
@@ -1,12 +1,9 @@
-import requests
-from config import MOOGSOFT_API_KEY
+from apis import response_cache
+from apis.fields import CATALOG_FIELDS
 from datetime import datetime, timezone, timedelta
+from config import MOOGSOFT_BASE_URL
 
-CATALOG_API_URL = "https://api.moogsoft.ai/v2/catalogs"
-HEADERS = {
-    "apikey": MOOGSOFT_API_KEY,
-    "Content-Type": "application/json"
-}
+CATALOG_API_URL = f"{MOOGSOFT_BASE_URL}/v2/catalogs"
 
 # Define IST timezone (UTC+5:30)
 IST = timezone(timedelta(hours=5, minutes=30))
@@ -30,14 +27,38 @@ def fetch_recent_catalog_updates(epoch_now: int, limit: int = 5) -> dict:
             "sync_status": "Success" or "Failed"
         }
     """
+    data = fetch_catalogs()
+    if data is None:
+        return {"recent_catalogs": [], "sync_status": "Failed"}
+
+    return summarize_catalogs(data, epoch_now, limit)
+
+def fetch_catalogs() -> dict | None:
+    """
+    The catalogs list response, or None if the request failed.
+    """
+    try:
+        return response_cache.get_json(CATALOG_API_URL, endpoint="catalogs", fields=CATALOG_FIELDS)
+    except Exception as e:
+        print(f"Error fetching catalogs: {e}")
+        return None
+
+async def fetch_recent_catalog_updates_async(epoch_now: int, limit: int = 5) -> dict:
+    """
+    Async variant of fetch_recent_catalog_updates.
+    """
     try:
-        response = requests.get(CATALOG_API_URL, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        data = await response_cache.get_json_async(CATALOG_API_URL, endpoint="catalogs", fields=CATALOG_FIELDS)
     except Exception as e:
         print(f"Error fetching catalogs: {e}")
         return {"recent_catalogs": [], "sync_status": "Failed"}
 
+    return summarize_catalogs(data, epoch_now, limit)
+
+def summarize_catalogs(data: dict, epoch_now: int, limit: int) -> dict:
+    """
+    Turn a catalogs list response into the recent catalog / sync status summary.
+    """
     if data.get("status") != "success":
         print(f"API returned error: {data}")
         return {"recent_catalogs": [], "sync_status": "Failed"}
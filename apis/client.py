@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import telemetry
+from config import (
+    MOOGSOFT_API_KEY, HTTP_POOL_SIZE, HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+)
+
+# Responses worth retrying: throttling and transient server/gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Read timeouts in seconds per logical endpoint
+ENDPOINT_TIMEOUTS = {
+    "stats": 15,
+    "integrations": 15,
+    "integration_errors": 10,
+    "catalogs": 15,
+    "maintenance_windows": 10,
+    "maintenance_alerts": 15,
+    "audits": 15,
+    "alerts": 30,
+    "incidents": 30,
+}
+DEFAULT_TIMEOUT = 15
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide pooled Session, creating it on first use.
+
+    All apis/* modules share it so TCP/TLS connections to Moogsoft are kept
+    alive and reused across sections and threads.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_SIZE,
+                    pool_maxsize=HTTP_POOL_SIZE,
+                    max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "apikey": MOOGSOFT_API_KEY,
+                    "Content-Type": "application/json"
+                })
+                _session = session
+    return _session
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """
+    Delay before retry number `attempt` (0-based).
+
+    A server supplied Retry-After wins; otherwise use exponential backoff
+    with full jitter. Either way the delay is capped at HTTP_BACKOFF_MAX, so
+    a large Retry-After cannot stall a call without a deadline; callers with
+    a deadline give up instead of sleeping past it (_past_deadline).
+    """
+    if retry_after is not None:
+        return min(retry_after, HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def _past_deadline(give_up_at: float | None, delay: float) -> bool:
+    return give_up_at is not None and time.monotonic() + delay >= give_up_at
+
+
+def request(method: str, url: str, endpoint: str = None, timeout: float = None,
+            deadline: float = None, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session, retrying throttled and
+    transient failures.
+
+    Args:
+        method: HTTP method.
+        url: Absolute URL.
+        endpoint: Key into ENDPOINT_TIMEOUTS, used when timeout is not given.
+        timeout: Explicit timeout in seconds.
+        deadline: Total seconds allowed for the call including retries and
+            backoff; the timeout of each attempt is shortened to fit.
+        **kwargs: Passed through to requests (params, json, data, headers...).
+
+    Returns:
+        requests.Response: The last response; callers still call raise_for_status().
+
+    Raises:
+        requests.RequestException: If the connection keeps failing after all retries.
+    """
+    if timeout is None:
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    session = get_session()
+    give_up_at = time.monotonic() + deadline if deadline is not None else None
+    t0 = time.perf_counter()
+
+    attempt = 0
+    response = None
+    try:
+        while True:
+            attempt_timeout = timeout
+            if give_up_at is not None:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Deadline of {deadline}s exceeded for {method} {url}")
+                attempt_timeout = min(timeout, remaining)
+
+            response = None
+            try:
+                response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = backoff_delay(attempt)
+                if attempt >= HTTP_MAX_RETRIES or _past_deadline(give_up_at, delay):
+                    raise
+                print(f"Retrying {method} {url} in {delay:.1f}s after error: {e}")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= HTTP_MAX_RETRIES:
+                    return response
+                delay = backoff_delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                # No time left to wait for a retry: hand back the error response
+                if _past_deadline(give_up_at, delay):
+                    return response
+                print(f"Retrying {method} {url} in {delay:.1f}s after HTTP {response.status_code}")
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+    finally:
+        telemetry.record_call(
+            method, url, endpoint,
+            status=response.status_code if response is not None else None,
+            elapsed=time.perf_counter() - t0,
+            size=len(response.content) if response is not None else 0,
+            retries=attempt
+        )
+
+def get(url: str, endpoint: str = None, **kwargs) -> requests.Response:
+    return request("GET", url, endpoint=endpoint, **kwargs)
+
+
+def post(url: str, endpoint: str = None, **kwargs) -> requests.Response:
+    return request("POST", url, endpoint=endpoint, **kwargs)
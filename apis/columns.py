@@ -0,0 +1,254 @@
+from itertools import islice
+
+from apis.timestamps import _MS_THRESHOLD
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, group-bys fall back to plain loops
+    np = None
+
+
+class Interner:
+    """
+    Map repeated values (manager names, Nagios instances) to small int codes,
+    so a column stores one int per row and every row shares the same string.
+    """
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def code(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def codes_of(self, values: list) -> list:
+        """
+        Codes of a whole column of values, interning new ones in first-seen order.
+        """
+        codes = self.codes
+        for value in values:
+            if value not in codes:
+                self.code(value)
+        return [codes[value] for value in values]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def table(self, predicate):
+        """
+        Boolean column over the codes: predicate(value) for every interned value.
+        """
+        return column([bool(predicate(value)) for value in self.values], bool)
+
+
+# Rows per page when records arrive one at a time (store reads, single adds)
+PAGE_SIZE = 5000
+
+
+def pages(records, size: int = PAGE_SIZE):
+    """
+    Group a record stream into lists of up to size records.
+    """
+    records = iter(records)
+    while True:
+        page = list(islice(records, size))
+        if not page:
+            return
+        yield page
+
+
+def column(values: list, dtype=int):
+    """
+    Turn a list built while walking a page into a column: a NumPy array when
+    NumPy is installed, the list itself otherwise.
+    """
+    if np is None:
+        return values
+    return np.array(values, dtype={int: np.int64, float: np.float64, bool: np.bool_}[dtype])
+
+
+def epoch_seconds(values: list, parse, default: float):
+    """
+    Float column of timestamps. Plain integer epochs (seconds or milliseconds,
+    see apis.timestamps) are converted in one vectorized step; anything else
+    goes through parse(value), with default for unparseable values.
+    """
+    if np is not None and all(type(value) is int for value in values):
+        times = np.array(values, dtype=np.float64)
+        return np.where(times > _MS_THRESHOLD, times / 1000, times)
+    times = []
+    for value in values:
+        parsed = parse(value)
+        times.append(default if parsed is None else parsed)
+    return column(times, float)
+
+
+def where(mask) -> list:
+    """
+    Row indices where a boolean column is true, in row order.
+    """
+    if np is None:
+        return [i for i, flag in enumerate(mask) if flag]
+    return np.flatnonzero(mask).tolist()
+
+
+def take(mask, *columns) -> tuple:
+    """
+    Rows of every column where mask is true.
+    """
+    if np is None:
+        rows = where(mask)
+        return tuple([col[i] for i in rows] for col in columns)
+    return tuple(col[mask] for col in columns)
+
+
+def at_least(values, threshold):
+    if np is None:
+        return [value >= threshold for value in values]
+    return values >= threshold
+
+
+def in_window(values, window):
+    """
+    Boolean column of values inside a reducer window: a start (open ended),
+    or a (start, end) pair with end exclusive.
+    """
+    if not isinstance(window, tuple):
+        return at_least(values, window)
+    start, end = window
+    if np is None:
+        return [start <= value < end for value in values]
+    return (values >= start) & (values < end)
+
+
+def both(*masks):
+    """
+    Row-wise AND of boolean columns.
+    """
+    if np is None:
+        return [all(flags) for flags in zip(*masks)]
+    result = masks[0]
+    for mask in masks[1:]:
+        result = result & mask
+    return result
+
+
+def negate(mask):
+    if np is None:
+        return [not flag for flag in mask]
+    return ~mask
+
+
+def bitmask(flagged: list, base):
+    """
+    Int column of flag bits: base (an int column) with flag set on every row
+    where its boolean list is true, for each (flag, booleans) of flagged.
+    """
+    if np is None:
+        flags = list(base)
+        for flag, mask in flagged:
+            for row, is_set in enumerate(mask):
+                if is_set:
+                    flags[row] |= flag
+        return flags
+    flags = base.copy()
+    for flag, mask in flagged:
+        flags[np.array(mask, dtype=np.bool_)] |= flag
+    return flags
+
+
+def matches(flags, mask: int, value: int):
+    """
+    Boolean column: flags & mask == value for every row of a bitmask column.
+    """
+    if np is None:
+        return [flag & mask == value for flag in flags]
+    return (flags & mask) == value
+
+
+def lookup(table, codes):
+    """
+    Gather a per-code table (see Interner.table) for every row's code.
+    """
+    if np is None:
+        return [table[code] for code in codes]
+    return table[codes]
+
+
+def total(values) -> int:
+    if np is None:
+        return sum(values)
+    return int(values.sum())
+
+
+class GroupCounters:
+    """
+    Integer counters per interned group code, summed one page at a time.
+
+    Groups are reported in the order they were first counted, which matches
+    the key order a row-at-a-time setdefault loop would have produced.
+
+    Args:
+        names: Counter names; every add() supplies a weight column for each,
+            or None to count rows.
+    """
+
+    def __init__(self, names: tuple):
+        self.names = names
+        self.order = []
+        self.counters = {name: [] for name in names} if np is None else \
+            {name: np.zeros(0, dtype=np.int64) for name in names}
+
+    def _grow(self, size: int) -> None:
+        for name, counter in self.counters.items():
+            if len(counter) < size:
+                if np is None:
+                    counter.extend([0] * (size - len(counter)))
+                else:
+                    self.counters[name] = np.concatenate([counter, np.zeros(size - len(counter), dtype=np.int64)])
+
+    def add(self, codes, size: int, **weights) -> None:
+        """
+        Add one page.
+
+        Args:
+            codes: Group code of every row to count.
+            size: Number of interned codes so far (upper bound of codes).
+            **weights: Per-row column for each counter name, or None to add 1 per row.
+        """
+        if not len(codes):
+            return
+        self._grow(size)
+        known = set(self.order)
+
+        if np is None:
+            new = [code for code in dict.fromkeys(codes) if code not in known]
+            for name in self.names:
+                counter = self.counters[name]
+                weight = weights.get(name)
+                if weight is None:
+                    for code in codes:
+                        counter[code] += 1
+                else:
+                    for code, value in zip(codes, weight):
+                        counter[code] += value
+        else:
+            distinct, first = np.unique(codes, return_index=True)
+            new = [code for code in distinct[np.argsort(first)].tolist() if code not in known]
+            for name in self.names:
+                weight = weights.get(name)
+                sums = np.bincount(codes, weights=weight, minlength=size)
+                self.counters[name] += sums.astype(np.int64) if weight is not None else sums
+
+        self.order.extend(new)
+
+    def items(self, values: list):
+        """
+        Yield (group value, {counter name: int}) in first-counted order.
+        """
+        for code in self.order:
+            yield values[code], {name: int(self.counters[name][code]) for name in self.names}
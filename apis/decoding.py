@@ -0,0 +1,115 @@
+import json
+from typing import Any, TypedDict
+
+# Optional faster decoders, preferred in this order when JSON_DECODER is "auto"
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from apis.fields import FieldSpec
+from config import JSON_DECODER
+
+BACKENDS = ("msgspec", "orjson", "json")
+
+
+def available_backends() -> list:
+    installed = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def resolve_backend(name: str = JSON_DECODER) -> str:
+    """
+    Map a JSON_DECODER setting to an installed backend.
+
+    Raises:
+        RuntimeError: If a specific backend is requested but not installed.
+    """
+    if name == "auto":
+        return available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON decoder '{name}', expected one of {('auto',) + BACKENDS}")
+    if name not in available_backends():
+        raise RuntimeError(f"JSON decoder '{name}' is not installed: pip install {name}")
+    return name
+
+
+def record_type(spec: FieldSpec, name: str) -> type:
+    """
+    TypedDict describing the records of a FieldSpec: its fields, and for
+    nested fields only their listed sub-keys. Values are left untyped, so a
+    record the API shapes differently still decodes.
+    """
+    annotations = {}
+    for key in spec.fields:
+        subkeys = spec.nested.get(key)
+        if subkeys:
+            nested = TypedDict(f"{name}_{key}", {subkey: Any for subkey in subkeys}, total=False)
+            annotations[key] = nested | None
+        else:
+            annotations[key] = Any
+    return TypedDict(name, annotations, total=False)
+
+
+def page_type(spec: FieldSpec, name: str) -> type:
+    """
+    TypedDict of a search response page ({"data": {"result": [...], "search_after": ...}})
+    whose records follow spec.
+    """
+    data = TypedDict(f"{name}Data", {"result": list[record_type(spec, name)], "search_after": Any}, total=False)
+    return TypedDict(f"{name}Page", {"data": data}, total=False)
+
+
+class Decoder:
+    """
+    Decode JSON response bodies with the fastest installed backend.
+
+    With msgspec and a FieldSpec, pages are decoded against page_type(spec):
+    fields the spec does not list are skipped while parsing instead of being
+    built into dicts and thrown away. Bodies that do not fit the schema are
+    decoded untyped. orjson and the stdlib json module always decode the
+    whole body.
+
+    Args:
+        spec: Optional FieldSpec of the page records.
+        name: Name of the generated page type, for error messages.
+        backend: JSON_DECODER style setting, defaults to the configured one.
+    """
+
+    def __init__(self, spec: FieldSpec = None, name: str = "Records", backend: str = None):
+        self.backend = resolve_backend(backend or JSON_DECODER)
+        self._typed = None
+        if self.backend == "msgspec":
+            self._untyped = msgspec.json.Decoder().decode
+            if spec is not None:
+                self._typed = msgspec.json.Decoder(page_type(spec, name)).decode
+        elif self.backend == "orjson":
+            self._untyped = orjson.loads
+        else:
+            self._untyped = json.loads
+
+    def __call__(self, body: bytes):
+        if self._typed is not None:
+            try:
+                return self._typed(body)
+            except msgspec.ValidationError:
+                pass
+        return self._untyped(body)
+
+
+_default = None
+
+
+def loads(body: bytes):
+    """
+    Decode a JSON body with the configured backend and no schema.
+    """
+    global _default
+    if _default is None:
+        _default = Decoder()
+    return _default(body)
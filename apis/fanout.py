@@ -0,0 +1,30 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fan_out(func, items: list, max_workers: int) -> list:
+    """
+    Call func(item) for every item on a bounded thread pool.
+
+    Args:
+        func: Callable taking one item.
+        items: Inputs, in the order results should be returned.
+        max_workers: Upper bound on concurrent calls.
+
+    Returns:
+        list: One result per item, in the same order as items, regardless
+        of completion order. Exceptions from func propagate to the caller.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers, len(items)))
+    if workers == 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout") as executor:
+        # Run each call in a copy of the caller's context so telemetry
+        # attributes it to the caller's section
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        return [future.result() for future in futures]
@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    The parts of a Moogsoft record one consumer actually reads.
+
+    Records streamed straight into a reducer only need the server-side
+    projection; trim() is for records kept beyond their page (the store,
+    fetch_*_since lists, error lists held until every integration returned).
+
+    Attributes:
+        fields: Top-level keys kept. Search endpoints receive them as the
+            payload's "fields", so the server drops everything else.
+        nested: { key: subkeys } for dict values of which only some keys are read.
+        presence: List-valued keys that are only checked for emptiness; at most
+            their first item is kept.
+    """
+    fields: tuple
+    nested: dict = field(default_factory=dict)
+    presence: tuple = ()
+
+    def payload_fields(self) -> list:
+        return list(self.fields)
+
+    def trim(self, record: dict) -> dict:
+        """
+        Reduce a freshly decoded record to this spec, in place. Missing keys stay missing.
+        """
+        for key in [key for key in record if key not in self.fields]:
+            del record[key]
+        for key, subkeys in self.nested.items():
+            value = record.get(key)
+            if isinstance(value, dict):
+                record[key] = {subkey: value[subkey] for subkey in subkeys if subkey in value}
+        for key in self.presence:
+            value = record.get(key)
+            if isinstance(value, list):
+                del value[1:]
+        return record
+
+    def trim_page(self, records: list) -> list:
+        for record in records:
+            self.trim(record)
+        return records
+
+
+def trim_list_response(data: dict, spec: FieldSpec) -> dict:
+    """
+    Trim the records of a {"status": ..., "data": [...]} list response in place,
+    for endpoints that cannot project fields server-side.
+    """
+    if isinstance(data, dict) and isinstance(data.get("data"), list):
+        data["data"] = spec.trim_page(data["data"])
+    return data
+
+
+def trim_result_response(data: dict, spec: FieldSpec) -> dict:
+    """
+    Trim the records of a {"status": ..., "data": {"result": [...]}} response in place.
+    """
+    if isinstance(data, dict) and isinstance(data.get("data"), dict):
+        spec.trim_page(data["data"].get("result", []))
+    return data
+
+
+# apis/alerts.py: AlertColumns only reads tags.instance and whether incidents is empty
+ALERT_SUMMARY_FIELDS = FieldSpec(
+    fields=("alert_id", "manager", "event_count", "incidents", "tags", "first_event_time"),
+    nested={"tags": ("instance",)},
+    presence=("incidents",)
+)
+
+# apis/incidents.py: IncidentColumns
+INCIDENT_SUMMARY_FIELDS = FieldSpec(
+    fields=("incident_id", "created_at", "tags"),
+    nested={"tags": (
+        "manager", "SNOWInc", "SNOWIncidentCreated", "upgraded",
+        "auto_close", "cmdb_ci", "Workload", "source"
+    )}
+)
+
+# apis/maintenance.py: MaintenanceAlertGrouper
+MAINTENANCE_ALERT_FIELDS = FieldSpec(
+    fields=("alert_id", "manager", "created_at")
+)
+
+# apis/maintenance.py: summarize_maintenance
+MAINTENANCE_WINDOW_FIELDS = FieldSpec(
+    fields=("start", "duration", "filter")
+)
+
+# apis/catalogs.py: summarize_catalogs
+CATALOG_FIELDS = FieldSpec(
+    fields=("name", "entries", "last_updated")
+)
+
+# apis/inbound_integrations.py: merge_integration_responses
+BYOAPI_INTEGRATION_FIELDS = FieldSpec(
+    fields=("id", "endpointName", "integration")
+)
+
+# apis/outbound_integrations.py: summarize_outbound_integrations
+WEBHOOK_INTEGRATION_FIELDS = FieldSpec(
+    fields=("id", "name")
+)
+
+# apis/inbound_errors.py: summarize_integration
+BYOAPI_ERROR_FIELDS = FieldSpec(
+    fields=("timestamp", "errors")
+)
+
+# apis/outbound_errors.py: summarize_integration
+WEBHOOK_ERROR_FIELDS = FieldSpec(
+    fields=("timestamp", "message")
+)
@@ -1,13 +1,25 @@
-import requests
-from config import MOOGSOFT_API_KEY
-from datetime import datetime, timedelta
+import asyncio
+from apis.fanout import fan_out
+from apis.fields import BYOAPI_ERROR_FIELDS
+from apis.integration_errors import fetch_error_records, fetch_error_records_async
+from config import ERRORS_MAX_WORKERS, MOOGSOFT_BASE_URL
 
-ERROR_API_TEMPLATE = "https://api.moogsoft.ai/v1/integrations/byoapi/{id}/errors"
+ERROR_API_TEMPLATE = MOOGSOFT_BASE_URL + "/v1/integrations/byoapi/{id}/errors"
 
-HEADERS = {
-    "apikey": MOOGSOFT_API_KEY,
-    "Content-Type": "application/json"
-}
+def fetch_integration_errors(integration: dict) -> list | None:
+    """
+    Fetch the raw error records of one integration.
+
+    Returns:
+        list of error records, or None if the request failed.
+    """
+    return fetch_error_records(ERROR_API_TEMPLATE.format(id=integration["id"]), BYOAPI_ERROR_FIELDS)
+
+async def fetch_integration_errors_async(integration: dict) -> list | None:
+    """
+    Async variant of fetch_integration_errors.
+    """
+    return await fetch_error_records_async(ERROR_API_TEMPLATE.format(id=integration["id"]), BYOAPI_ERROR_FIELDS)
 
 def fetch_inbound_errors(integrations: list[dict], epoch_now: int) -> dict:
     """
@@ -23,50 +35,89 @@ def fetch_inbound_errors(integrations: list[dict], epoch_now: int) -> dict:
             "older_errors": { manager_name: { "count": int }}
         }
     """
+    # Requests run concurrently and each worker folds its integration's
+    # records into a summary; merging in input order keeps the dict order stable
+    summaries = fan_out(lambda i: fetch_integration_summary(i, epoch_now), integrations, ERRORS_MAX_WORKERS)
+    return merge_summaries(integrations, summaries)
+
+async def fetch_inbound_errors_async(integrations: list[dict], epoch_now: int) -> dict:
+    """
+    Async variant of fetch_inbound_errors.
+    """
+    summaries = await asyncio.gather(*(fetch_integration_summary_async(i, epoch_now) for i in integrations))
+    return merge_summaries(integrations, summaries)
+
+def fetch_integration_summary(integration: dict, epoch_now: int) -> dict | None:
+    """
+    Fetch one integration's error records and fold them into a summary
+    (summarize_integration); None if the request failed.
+    """
+    errors = fetch_integration_errors(integration)
+    return None if errors is None else summarize_integration(errors, epoch_now)
+
+async def fetch_integration_summary_async(integration: dict, epoch_now: int) -> dict | None:
+    """
+    Async variant of fetch_integration_summary.
+    """
+    errors = await fetch_integration_errors_async(integration)
+    return None if errors is None else summarize_integration(errors, epoch_now)
+
+def summarize_integration(errors: list, epoch_now: int) -> dict:
+    """
+    Fold one integration's error records into recent/older counts and the
+    reasons of the recent ones.
+
+    Returns:
+        dict { "count": int, "reasons": set[str], "older_count": int }
+    """
     recent_threshold = epoch_now - (24 * 60 * 60 * 1000)
+    summary = {"count": 0, "reasons": set(), "older_count": 0}
+
+    for error in errors:
+        timestamp = error.get("timestamp")
+
+        # Errors after the report time belong to a later report (backfills)
+        if timestamp is None or timestamp > epoch_now:
+            continue
+
+        if timestamp >= recent_threshold:
+            summary["count"] += 1
+            summary["reasons"].update(error.get("errors", []))
+        else:
+            summary["older_count"] += 1
+
+    return summary
+
+def merge_summaries(integrations: list[dict], summaries: list) -> dict:
+    """
+    Merge per-integration summaries (summarize_integration, None for failed
+    requests), given in the same order as integrations, into the recent/older
+    summary; integrations sharing a name are added up.
+    """
     recent_errors = {}
     older_errors = {}
 
-    for integration in integrations:
-        id_ = integration["id"]
+    for integration, summary in zip(integrations, summaries):
         manager = integration["name"]
 
-        url = ERROR_API_TEMPLATE.format(id=id_)
-
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as e:
-            print(f"Error fetching from {url}: {e}")
+        if summary is None:
             continue
 
-        if data.get("status") != "success":
-            continue
+        if summary["count"]:
+            if manager not in recent_errors:
+                recent_errors[manager] = {
+                    "count": 0,
+                    "reasons": set()
+                }
+            recent_errors[manager]["count"] += summary["count"]
+            recent_errors[manager]["reasons"].update(summary["reasons"])
 
-        errors = data.get("data", [])
-
-        for error in errors:
-            timestamp = error.get("timestamp")
-            reasons = error.get("errors", [])
-
-            if timestamp is None:
-                continue
-
-            if timestamp >= recent_threshold:
-                if manager not in recent_errors:
-                    recent_errors[manager] = {
-                        "count": 0,
-                        "reasons": set()
-                    }
-                recent_errors[manager]["count"] += 1
-                recent_errors[manager]["reasons"].update(reasons)
-            else:
-                if manager not in older_errors:
-                    older_errors[manager] = {
-                        "count": 0
-                    }
-                older_errors[manager]["count"] += 1
+        if summary["older_count"]:
+            if manager not in older_errors:
+                older_errors[manager] = {
+                    "count": 0
+                }
+            older_errors[manager]["count"] += summary["older_count"]
 
     # Convert reason sets to list
     for manager in recent_errors:
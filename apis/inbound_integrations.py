@@ -1,55 +1,139 @@
-import requests
-from config import MOOGSOFT_API_KEY
+import asyncio
+from apis import response_cache
+from apis.fanout import fan_out
+from apis.fields import BYOAPI_INTEGRATION_FIELDS
+from config import INBOUND_MINIMAL_DISCOVERY, MOOGSOFT_BASE_URL
 
-BASE_URLS = [
-    "https://api.moogsoft.ai/v1/integrations/byoapi",
-    "https://api.moogsoft.ai/v1/integrations/byoapi?integration=DYNATRACE",
-    "https://api.moogsoft.ai/v1/integrations/byoapi?integration=NAGIOS",
-    "https://api.moogsoft.ai/v1/integrations/byoapi?integration=PROMETHEUS"
-]
+BYOAPI_URL = f"{MOOGSOFT_BASE_URL}/v1/integrations/byoapi"
+# Integration types with their own filtered list, queried alongside the
+# unfiltered one (see INBOUND_MINIMAL_DISCOVERY)
+INTEGRATION_TYPES = ("DYNATRACE", "NAGIOS", "PROMETHEUS")
+# Type of integrations whose record does not name one
+DEFAULT_INTEGRATION_TYPE = "BYOAPI"
+
+def integrations_url(integration_type: str = None) -> str:
+    """
+    BYOAPI list URL, filtered to one integration type unless it is None.
+    """
+    if integration_type is None:
+        return BYOAPI_URL
+    return f"{BYOAPI_URL}?integration={integration_type}"
+
+def fetch_integration_list(integration_type: str = None) -> dict | None:
+    """
+    Fetch one (possibly type filtered) BYOAPI list; None if the request failed.
+    """
+    url = integrations_url(integration_type)
+    try:
+        return response_cache.get_json(url, endpoint="integrations", fields=BYOAPI_INTEGRATION_FIELDS)
+    except Exception as e:
+        print(f"Error fetching from {url}: {e}")
+        return None
+
+async def fetch_integration_list_async(integration_type: str = None) -> dict | None:
+    """
+    Async variant of fetch_integration_list.
+    """
+    url = integrations_url(integration_type)
+    try:
+        return await response_cache.get_json_async(url, endpoint="integrations", fields=BYOAPI_INTEGRATION_FIELDS)
+    except Exception as e:
+        print(f"Error fetching from {url}: {e}")
+        return None
+
+def missing_types(data: dict | None) -> tuple:
+    """
+    INTEGRATION_TYPES that need their own filtered query after the unfiltered
+    list with INBOUND_MINIMAL_DISCOVERY: the types it does not include. All
+    of them when it failed or when its records do not name their type.
+    """
+    if not data or data.get("status") != "success":
+        return INTEGRATION_TYPES
+
+    records = data.get("data", [])
+    if not records or any(not record.get("integration") for record in records):
+        return INTEGRATION_TYPES
+
+    listed = {str(record["integration"]).upper() for record in records}
+    return tuple(integration_type for integration_type in INTEGRATION_TYPES if integration_type not in listed)
 
 def fetch_inbound_integrations() -> dict:
     """
-    Fetch all BYOAPI integrations from multiple Moogsoft endpoints.
+    Fetch all BYOAPI integrations from Moogsoft, typed by source.
+
+    The unfiltered list and the INTEGRATION_TYPES filtered lists are queried
+    concurrently, as the API does not say whether the unfiltered list holds
+    every integration of a type. With INBOUND_MINIMAL_DISCOVERY the unfiltered
+    list is fetched first and only the types it does not include are queried
+    with their own filter. The list endpoint is not paginated: each query is
+    one response.
 
     Returns:
         dict:
             {
                 "total": int,
-                "integrations": List[{"name": str, "id": str}]
+                "integrations": List[{"name": str, "id": str, "type": str}],
+                "by_type": { type: int }
             }
     """
-    headers = {
-        "apikey": MOOGSOFT_API_KEY,
-        "Content-Type": "application/json"
-    }
+    if not INBOUND_MINIMAL_DISCOVERY:
+        queries = [None, *INTEGRATION_TYPES]
+        return merge_integration_responses(list(zip(queries, fan_out(fetch_integration_list, queries, len(queries)))))
+
+    unfiltered = fetch_integration_list()
+    types = missing_types(unfiltered)
+    typed = fan_out(fetch_integration_list, types, len(types))
+    return merge_integration_responses([(None, unfiltered), *zip(types, typed)])
+
+async def fetch_inbound_integrations_async() -> dict:
+    """
+    Async variant of fetch_inbound_integrations.
+    """
+    if not INBOUND_MINIMAL_DISCOVERY:
+        queries = [None, *INTEGRATION_TYPES]
+        responses = await asyncio.gather(*(fetch_integration_list_async(query) for query in queries))
+        return merge_integration_responses(list(zip(queries, responses)))
+
+    unfiltered = await fetch_integration_list_async()
+    types = missing_types(unfiltered)
+    typed = await asyncio.gather(*(fetch_integration_list_async(integration_type) for integration_type in types))
+    return merge_integration_responses([(None, unfiltered), *zip(types, typed)])
 
+def merge_integration_responses(responses: list) -> dict:
+    """
+    Merge BYOAPI list responses, given as (integration type or None for the
+    unfiltered list, response or None if the request failed), into a
+    deduplicated integration list in response order.
+
+    An integration's type is the one its record names, else the filter of
+    the list it came from, else DEFAULT_INTEGRATION_TYPE.
+    """
     seen_ids = set()
     integrations = []
+    by_type = {}
 
-    for url in BASE_URLS:
-        try:
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as e:
-            print(f"Error fetching from {url}: {e}")
+    for integration_type, data in responses:
+        if data is None:
             continue
 
         if data.get("status") != "success":
-            print(f"API returned error from {url}: {data}")
+            print(f"API returned error from {integrations_url(integration_type)}: {data}")
             continue
 
         for item in data.get("data", []):
             integration_id = item.get("id")
             if integration_id and integration_id not in seen_ids:
                 seen_ids.add(integration_id)
+                source = str(item.get("integration") or integration_type or DEFAULT_INTEGRATION_TYPE).upper()
+                by_type[source] = by_type.get(source, 0) + 1
                 integrations.append({
                     "name": item.get("endpointName", "Unknown"),
-                    "id": integration_id
+                    "id": integration_id,
+                    "type": source
                 })
 
     return {
         "total": len(integrations),
-        "integrations": integrations
+        "integrations": integrations,
+        "by_type": by_type
     }
@@ -0,0 +1,45 @@
+from apis import client, async_client
+from apis.fields import FieldSpec
+from config import ERRORS_REQUEST_DEADLINE
+
+
+def fetch_error_records(url: str, spec: FieldSpec) -> list | None:
+    """
+    Fetch the raw error records of one integration, shared by the inbound
+    and outbound error sections.
+
+    Args:
+        url: Error log URL of the integration.
+        spec: FieldSpec the records are trimmed to.
+
+    Returns:
+        list of error records, or None if the request failed.
+    """
+    try:
+        response = client.get(url, endpoint="integration_errors", deadline=ERRORS_REQUEST_DEADLINE)
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        print(f"Error fetching from {url}: {e}")
+        return None
+
+    if data.get("status") != "success":
+        return None
+
+    return spec.trim_page(data.get("data", []))
+
+
+async def fetch_error_records_async(url: str, spec: FieldSpec) -> list | None:
+    """
+    Async variant of fetch_error_records.
+    """
+    try:
+        data = await async_client.get_json(url, endpoint="integration_errors", deadline=ERRORS_REQUEST_DEADLINE)
+    except Exception as e:
+        print(f"Error fetching from {url}: {e}")
+        return None
+
+    if data.get("status") != "success":
+        return None
+
+    return spec.trim_page(data.get("data", []))
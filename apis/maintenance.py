@@ -1,16 +1,17 @@
-import requests
-from config import MOOGSOFT_API_KEY
+import asyncio
+from apis import response_cache
+from apis.decoding import Decoder
+from apis.fields import MAINTENANCE_ALERT_FIELDS, MAINTENANCE_WINDOW_FIELDS, trim_result_response
+from apis.pagination import iter_search_after_pages, aiter_search_after_pages
 from datetime import datetime, timedelta
 import re
+from config import MOOGSOFT_BASE_URL
 
-MAINTENANCE_WINDOWS_API = "https://api.moogsoft.ai/v1/maintenance/windows?limit=5000"
-EXPIRED_OCCURRENCES_API = "https://api.moogsoft.ai/v1/maintenance/occurrences/expired?limit=5000"
-ALERTS_API = "https://api.moogsoft.ai/v1/alerts"
-
-HEADERS = {
-    "apikey": MOOGSOFT_API_KEY,
-    "Content-Type": "application/json"
-}
+MAINTENANCE_WINDOWS_API = f"{MOOGSOFT_BASE_URL}/v1/maintenance/windows?limit=5000"
+EXPIRED_OCCURRENCES_API = f"{MOOGSOFT_BASE_URL}/v1/maintenance/occurrences/expired?limit=5000"
+ALERTS_API = f"{MOOGSOFT_BASE_URL}/v1/alerts"
+MAINTENANCE_ALERTS_PAGE_SIZE = 5000
+MAINTENANCE_ALERTS_PAGE_DECODER = Decoder(MAINTENANCE_ALERT_FIELDS, "MaintenanceAlerts")
 
 def parse_config_items(filter_str: str) -> list:
     """
@@ -21,20 +22,17 @@ def parse_config_items(filter_str: str) -> list:
         return [item.strip(" '\"") for item in match.group(1).split(",")]
     return []
 
-def fetch_maintenance_and_alerts(epoch_now: int) -> dict:
+def maintenance_periods(epoch_now: int) -> dict:
     """
-    Fetch maintenance stats and alerts affected by maintenance.
+    Report periods for maintenance alert counts.
 
     Args:
         epoch_now: Current time in epoch ms.
 
     Returns:
-        dict: A dictionary with maintenance and alert stats.
+        dict: period name -> (start_ms, end_ms or None), in report order.
     """
     one_day_ms = 24 * 60 * 60 * 1000
-    now = epoch_now
-    last_24h = now - one_day_ms
-
     dt_now = datetime.utcfromtimestamp(epoch_now / 1000.0)
 
     # Calculate Sunday as start of the week
@@ -49,14 +47,179 @@ def fetch_maintenance_and_alerts(epoch_now: int) -> dict:
     start_last_week = int((sunday - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0).timestamp() * 1000)
     end_last_week = int((sunday - timedelta(milliseconds=1)).replace(hour=23, minute=59, second=59, microsecond=999999).timestamp() * 1000)
 
-    # Fetch Maintenance Windows
+    return {
+        "last_24h": (epoch_now - one_day_ms, None),
+        "this_week": (start_of_week, None),
+        "last_week": (start_last_week, end_last_week),
+        "this_month": (start_of_month, None)
+    }
+
+def maintenance_alerts_payload(created_after_ms: int) -> dict:
+    """
+    Build the alerts search payload for alerts tagged with a maintenance window
+    and created at or after created_after_ms.
+    """
+    return {
+        "limit": MAINTENANCE_ALERTS_PAGE_SIZE,
+        "utcOffset": "GMT+05:30",
+        # Oldest first with a unique tiebreaker, so search_after resumes
+        # exactly after the last alert of a page
+        "jsonSort": [{"sort": "asc", "colId": "created_at"}, {"sort": "asc", "colId": "alert_id"}],
+        "fields": MAINTENANCE_ALERT_FIELDS.payload_fields(),
+        "jsonFilter": {
+            "maintenance": {"filterType": "text", "type": "notBlank"},
+            "created_at": {
+                "filterType": "number",
+                "type": "greaterThanOrEqual",
+                "filter": created_after_ms // 1000
+            }
+        }
+    }
+
+class MaintenanceAlertGrouper:
+    """
+    Count maintenance alerts per manager for every report period in a single
+    pass. Alerts can be added one page at a time as they are fetched.
+    """
+
+    def __init__(self, periods: dict):
+        self.periods = list(periods.items())
+        self.counts = {name: {} for name in periods}
+
+    def add(self, alert: dict) -> None:
+        created_ms = alert.get("created_at", 0) * 1000  # Convert to ms for comparison
+        manager = alert.get("manager", "Unknown")
+
+        for name, (start, end) in self.periods:
+            if start and created_ms < start:
+                continue
+            if end and created_ms > end:
+                continue
+            counts = self.counts[name]
+            counts[manager] = counts.get(manager, 0) + 1
+
+    def add_page(self, page: list) -> None:
+        for alert in page:
+            self.add(alert)
+
+    def result(self) -> dict:
+        return self.counts
+
+def group_maintenance_alerts(alerts, periods: dict) -> dict:
+    """
+    Group an iterable of maintenance alerts into per-period manager counts.
+    """
+    grouper = MaintenanceAlertGrouper(periods)
+    for alert in alerts:
+        grouper.add(alert)
+    return grouper.result()
+
+def fetch_maintenance_windows() -> list:
     try:
-        windows_res = requests.get(MAINTENANCE_WINDOWS_API, headers=HEADERS, timeout=10)
-        windows_res.raise_for_status()
-        windows_data = windows_res.json().get("data", {}).get("result", [])
+        data = response_cache.get_json(MAINTENANCE_WINDOWS_API, endpoint="maintenance_windows",
+                                       fields=MAINTENANCE_WINDOW_FIELDS, trim=trim_result_response)
     except Exception as e:
         print("Error fetching maintenance windows:", e)
-        windows_data = []
+        return []
+    return data.get("data", {}).get("result", [])
+
+def fetch_maintenance_alert_counts(periods: dict) -> dict:
+    """
+    Page through the maintenance alerts created since the earliest period
+    start and group them while streaming. Every period's counts are None
+    (shown as failed) when paging fails, as they would be incomplete.
+    """
+    payload = maintenance_alerts_payload(min(start for start, _ in periods.values()))
+    grouper = MaintenanceAlertGrouper(periods)
+    try:
+        for page in iter_search_after_pages(ALERTS_API, payload, endpoint="maintenance_alerts",
+                                            decode=MAINTENANCE_ALERTS_PAGE_DECODER):
+            grouper.add_page(page)
+    except Exception as e:
+        print("Error fetching maintenance alerts:", e)
+        return dict.fromkeys(periods)
+    return grouper.result()
+
+def fetch_maintenance_and_alerts(epoch_now: int) -> dict:
+    """
+    Fetch maintenance stats and alerts affected by maintenance.
+
+    Args:
+        epoch_now: Current time in epoch ms.
+
+    Returns:
+        dict: A dictionary with maintenance and alert stats.
+    """
+    periods = maintenance_periods(epoch_now)
+    windows_data = fetch_maintenance_windows()
+    alerts_by_maintenance = fetch_maintenance_alert_counts(periods)
+    return summarize_maintenance(windows_data, alerts_by_maintenance, epoch_now)
+
+def fetch_maintenance_for_reports(report_times: list) -> dict:
+    """
+    Maintenance data of several reports (e.g. backfilled days) from one pull:
+    the windows are fetched once and the maintenance alerts are paged once
+    from the earliest period start, each counted into every report's periods.
+
+    Args:
+        report_times: Report times in epoch ms.
+
+    Returns:
+        dict: { report time: result of fetch_maintenance_and_alerts() }
+    """
+    periods = {}
+    for epoch_now in report_times:
+        for name, (start, end) in maintenance_periods(epoch_now).items():
+            periods[(epoch_now, name)] = (start, min(end, epoch_now) if end else epoch_now)
+
+    windows_data = fetch_maintenance_windows()
+    counts = fetch_maintenance_alert_counts(periods)
+    return {
+        epoch_now: summarize_maintenance(
+            windows_data,
+            {name: counts[(epoch_now, name)] for name in maintenance_periods(epoch_now)},
+            epoch_now
+        )
+        for epoch_now in report_times
+    }
+
+async def fetch_maintenance_and_alerts_async(epoch_now: int) -> dict:
+    """
+    Async variant of fetch_maintenance_and_alerts; windows and alerts are fetched concurrently.
+    """
+    periods = maintenance_periods(epoch_now)
+
+    async def fetch_windows():
+        try:
+            data = await response_cache.get_json_async(MAINTENANCE_WINDOWS_API, endpoint="maintenance_windows",
+                                                       fields=MAINTENANCE_WINDOW_FIELDS, trim=trim_result_response)
+            return data.get("data", {}).get("result", [])
+        except Exception as e:
+            print("Error fetching maintenance windows:", e)
+            return []
+
+    async def fetch_alert_counts():
+        payload = maintenance_alerts_payload(min(start for start, _ in periods.values()))
+        grouper = MaintenanceAlertGrouper(periods)
+        try:
+            async for page in aiter_search_after_pages(ALERTS_API, payload, endpoint="maintenance_alerts",
+                                                       decode=MAINTENANCE_ALERTS_PAGE_DECODER):
+                grouper.add_page(page)
+        except Exception as e:
+            print("Error fetching maintenance alerts:", e)
+            return dict.fromkeys(periods)
+        return grouper.result()
+
+    windows_data, alerts_by_maintenance = await asyncio.gather(fetch_windows(), fetch_alert_counts())
+    return summarize_maintenance(windows_data, alerts_by_maintenance, epoch_now)
+
+def summarize_maintenance(windows_data: list, alerts_by_maintenance: dict, epoch_now: int) -> dict:
+    """
+    Build the maintenance summary and attach the per-period maintenance alert counts.
+    """
+    one_day_ms = 24 * 60 * 60 * 1000
+    last_24h = epoch_now - one_day_ms
+    start_of_month = maintenance_periods(epoch_now)["this_month"][0]
 
     active_24h = 0
     config_items_count = 0
@@ -75,51 +238,13 @@ def fetch_maintenance_and_alerts(epoch_now: int) -> dict:
         if start and start >= start_of_month:
             total_this_month += 1
 
-    # Fetch Alerts affected by maintenance
-    try:
-        alerts_res = requests.post(ALERTS_API, headers=HEADERS, json={
-            "limit": 5000,
-            "start": 0,
-            "utcOffset": "GMT+05:30",
-            "jsonSort": [{"sort": "desc", "colId": "last_event_time"}],
-            "fields": ["incidents", "maintenance", "manager", "alert_id", "created_at"],
-            "jsonFilter": {
-                "maintenance": {"filterType": "text", "type": "notBlank"}
-            }
-        }, timeout=15)
-        alerts_res.raise_for_status()
-        alerts = alerts_res.json().get("data", {}).get("result", [])
-    except Exception as e:
-        print("Error fetching maintenance alerts:", e)
-        alerts = []
-
-    def group_alerts(alerts, time_filter_start=None, time_filter_end=None):
-        counts = {}
-        for alert in alerts:
-            created_sec = alert.get("created_at", 0)
-            created_ms = created_sec * 1000  # Convert to ms for comparison
-
-            if time_filter_start and created_ms < time_filter_start:
-                continue
-            if time_filter_end and created_ms > time_filter_end:
-                continue
-
-            manager = alert.get("manager", "Unknown")
-            counts[manager] = counts.get(manager, 0) + 1
-        return counts
-
     return {
         "maintenance_summary": {
             "active_last_24h": active_24h,
             "config_items_in_24h": config_items_count,
             "total_this_month": total_this_month
         },
-        "alerts_by_maintenance": {
-            "last_24h": group_alerts(alerts, time_filter_start=last_24h),
-            "this_week": group_alerts(alerts, time_filter_start=start_of_week),
-            "last_week": group_alerts(alerts, time_filter_start=start_last_week, time_filter_end=end_last_week),
-            "this_month": group_alerts(alerts, time_filter_start=start_of_month)
-        }
+        "alerts_by_maintenance": alerts_by_maintenance
     }
 
 if __name__ == "__main__":
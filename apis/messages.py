@@ -0,0 +1,92 @@
+import heapq
+import re
+from functools import lru_cache
+
+from config import ERRORS_TOP_MESSAGES
+
+# Variable parts of error messages, matched in one pass; the first
+# alternative that matches at a position wins, so timestamps and UUIDs are
+# replaced whole before the numbers inside them. Every part starts with a hex
+# digit, which the leading lookahead checks before trying the alternatives.
+_VARIABLE_PARTS = re.compile(r"(?=[0-9a-fA-F])(?:" + "|".join((
+    r"(?P<time>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)",
+    r"(?P<uuid>\b[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}\b)",
+    r"(?P<ip>\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b)",
+    # Hex or decimal ids, hashes and epoch times: 8+ hex digits, at least one a digit
+    r"(?P<id>\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b)",
+    # Ports, counters, short ids; shorter numbers such as HTTP statuses or
+    # "after 30s" are part of the template
+    r"(?P<n>\d{4,})",
+)) + ")")
+_PLACEHOLDERS = {"time": "<time>", "uuid": "<id>", "ip": "<ip>", "id": "<id>", "n": "<n>"}
+
+
+def _placeholder(match: re.Match) -> str:
+    return _PLACEHOLDERS[match.lastgroup]
+
+
+@lru_cache(maxsize=1024)
+def normalize_message(message: str) -> str:
+    """
+    Template of an error message: ids, timestamps, IP addresses and long
+    numbers replaced by placeholders, so repeats of one error share it.
+    """
+    return _VARIABLE_PARTS.sub(_placeholder, message)
+
+
+class MessageTemplates:
+    """
+    Streaming count of error messages per template (normalize_message).
+
+    Only one entry per distinct template is kept, with its count, first and
+    last seen timestamps and the first message seen as an example, so memory
+    grows with the number of distinct errors rather than their volume.
+    """
+
+    def __init__(self):
+        # template -> [count, first_seen, last_seen, example]
+        self.templates = {}
+
+    def add(self, message: str, timestamp: int) -> None:
+        template = normalize_message(message)
+        entry = self.templates.get(template)
+        if entry is None:
+            self.templates[template] = [1, timestamp, timestamp, message]
+            return
+        entry[0] += 1
+        if timestamp < entry[1]:
+            entry[1] = timestamp
+        elif timestamp > entry[2]:
+            entry[2] = timestamp
+
+    def update(self, other: "MessageTemplates") -> None:
+        """
+        Add the counts of another MessageTemplates, e.g. of an integration
+        sharing this one's name.
+        """
+        for template, (count, first_seen, last_seen, example) in other.templates.items():
+            entry = self.templates.get(template)
+            if entry is None:
+                self.templates[template] = [count, first_seen, last_seen, example]
+                continue
+            entry[0] += count
+            entry[1] = min(entry[1], first_seen)
+            entry[2] = max(entry[2], last_seen)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def top(self, k: int = ERRORS_TOP_MESSAGES) -> list:
+        """
+        The k most frequent templates, most frequent first.
+
+        Returns:
+            list of { "template": str, "count": int, "first_seen": int,
+            "last_seen": int, "example": str }, timestamps as given to add().
+        """
+        top = heapq.nlargest(k, self.templates.items(), key=lambda item: item[1][0])
+        return [
+            {"template": template, "count": count, "first_seen": first_seen,
+             "last_seen": last_seen, "example": example}
+            for template, (count, first_seen, last_seen, example) in top
+        ]
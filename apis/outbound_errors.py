@@ -1,12 +1,26 @@
-import requests
-from config import MOOGSOFT_API_KEY
+import asyncio
+from apis.fanout import fan_out
+from apis.fields import WEBHOOK_ERROR_FIELDS
+from apis.integration_errors import fetch_error_records, fetch_error_records_async
+from apis.messages import MessageTemplates
+from config import ERRORS_MAX_WORKERS, MOOGSOFT_BASE_URL
 
-ERROR_API_TEMPLATE = "https://api.moogsoft.ai/v2/integrations/webhooks/logs/{id}?errors=true&successes=false"
+ERROR_API_TEMPLATE = MOOGSOFT_BASE_URL + "/v2/integrations/webhooks/logs/{id}?errors=true&successes=false"
 
-HEADERS = {
-    "apikey": MOOGSOFT_API_KEY,
-    "Content-Type": "application/json"
-}
+def fetch_integration_errors(integration: dict) -> list | None:
+    """
+    Fetch the raw error records of one integration.
+
+    Returns:
+        list of error records, or None if the request failed.
+    """
+    return fetch_error_records(ERROR_API_TEMPLATE.format(id=integration["id"]), WEBHOOK_ERROR_FIELDS)
+
+async def fetch_integration_errors_async(integration: dict) -> list | None:
+    """
+    Async variant of fetch_integration_errors.
+    """
+    return await fetch_error_records_async(ERROR_API_TEMPLATE.format(id=integration["id"]), WEBHOOK_ERROR_FIELDS)
 
 def fetch_outbound_errors(integrations: list[dict], epoch_now: int) -> dict:
     """
@@ -18,54 +32,105 @@ def fetch_outbound_errors(integrations: list[dict], epoch_now: int) -> dict:
 
     Returns:
         dict {
-            "recent_errors": { name: { "count": int, "messages": list[str] }},
+            "recent_errors": { name: {
+                "count": int,
+                "messages": list of the ERRORS_TOP_MESSAGES most frequent
+                    message templates, see MessageTemplates.top,
+                "message_templates": int  # distinct templates
+            }},
             "older_errors": { name: { "count": int }}
         }
     """
+    # Requests run concurrently and each worker folds its integration's
+    # records into a summary, so only one page per worker is held at a time;
+    # merging in input order keeps the dict order stable
+    summaries = fan_out(lambda i: fetch_integration_summary(i, epoch_now), integrations, ERRORS_MAX_WORKERS)
+    return merge_summaries(integrations, summaries)
+
+async def fetch_outbound_errors_async(integrations: list[dict], epoch_now: int) -> dict:
+    """
+    Async variant of fetch_outbound_errors.
+    """
+    summaries = await asyncio.gather(*(fetch_integration_summary_async(i, epoch_now) for i in integrations))
+    return merge_summaries(integrations, summaries)
+
+def fetch_integration_summary(integration: dict, epoch_now: int) -> dict | None:
+    """
+    Fetch one integration's error records and fold them into a summary
+    (summarize_integration); None if the request failed.
+    """
+    logs = fetch_integration_errors(integration)
+    return None if logs is None else summarize_integration(logs, epoch_now)
+
+async def fetch_integration_summary_async(integration: dict, epoch_now: int) -> dict | None:
+    """
+    Async variant of fetch_integration_summary.
+    """
+    logs = await fetch_integration_errors_async(integration)
+    return None if logs is None else summarize_integration(logs, epoch_now)
+
+def summarize_integration(logs: list, epoch_now: int) -> dict:
+    """
+    Fold one integration's error records into recent/older counts. Recent
+    messages are counted per template as they stream by (MessageTemplates).
+
+    Returns:
+        dict { "count": int, "messages": MessageTemplates, "older_count": int }
+    """
     recent_threshold = epoch_now - (24 * 60 * 60 * 1000)
+    summary = {"count": 0, "messages": MessageTemplates(), "older_count": 0}
+
+    for log in logs:
+        timestamp = log.get("timestamp")
+
+        # Errors after the report time belong to a later report (backfills)
+        if timestamp is None or timestamp > epoch_now:
+            continue
+
+        if timestamp >= recent_threshold:
+            summary["count"] += 1
+            summary["messages"].add(log.get("message", "No message"), timestamp)
+        else:
+            summary["older_count"] += 1
+
+    return summary
+
+def merge_summaries(integrations: list[dict], summaries: list) -> dict:
+    """
+    Merge per-integration summaries (summarize_integration, None for failed
+    requests), given in the same order as integrations, into the recent/older
+    summary; integrations sharing a name are added up.
+    """
     recent_errors = {}
     older_errors = {}
 
-    for integration in integrations:
-        id_ = integration["id"]
+    for integration, summary in zip(integrations, summaries):
         name = integration["name"]
 
-        url = ERROR_API_TEMPLATE.format(id=id_)
-
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as e:
-            print(f"Error fetching from {url}: {e}")
+        if summary is None:
             continue
 
-        if data.get("status") != "success":
-            continue
+        if summary["count"]:
+            if name not in recent_errors:
+                recent_errors[name] = {
+                    "count": 0,
+                    "messages": MessageTemplates()
+                }
+            recent_errors[name]["count"] += summary["count"]
+            recent_errors[name]["messages"].update(summary["messages"])
+
+        if summary["older_count"]:
+            if name not in older_errors:
+                older_errors[name] = {
+                    "count": 0
+                }
+            older_errors[name]["count"] += summary["older_count"]
 
-        logs = data.get("data", [])
-
-        for log in logs:
-            timestamp = log.get("timestamp")
-            message = log.get("message", "No message")
-
-            if timestamp is None:
-                continue
-
-            if timestamp >= recent_threshold:
-                if name not in recent_errors:
-                    recent_errors[name] = {
-                        "count": 0,
-                        "messages": []
-                    }
-                recent_errors[name]["count"] += 1
-                recent_errors[name]["messages"].append(message)
-            else:
-                if name not in older_errors:
-                    older_errors[name] = {
-                        "count": 0
-                    }
-                older_errors[name]["count"] += 1
+    # Keep the most frequent message templates
+    for errors in recent_errors.values():
+        templates = errors["messages"]
+        errors["messages"] = templates.top()
+        errors["message_templates"] = len(templates)
 
     return {
         "recent_errors": recent_errors,
@@ -1,7 +1,8 @@
-import requests
-from config import MOOGSOFT_API_KEY
+from apis import response_cache
+from apis.fields import WEBHOOK_INTEGRATION_FIELDS
+from config import MOOGSOFT_BASE_URL
 
-WEBHOOKS_URL = "https://api.moogsoft.ai/v2/integrations/webhooks/items"
+WEBHOOKS_URL = f"{MOOGSOFT_BASE_URL}/v2/integrations/webhooks/items"
 
 def fetch_outbound_integrations() -> dict:
     """
@@ -14,19 +15,31 @@ def fetch_outbound_integrations() -> dict:
                 "integrations": List[{"name": str, "id": str}]
             }
     """
-    headers = {
-        "apikey": MOOGSOFT_API_KEY,
-        "Content-Type": "application/json"
-    }
+    try:
+        data = response_cache.get_json(WEBHOOKS_URL, endpoint="integrations", fields=WEBHOOK_INTEGRATION_FIELDS)
+    except Exception as e:
+        print(f"Error fetching outbound integrations: {e}")
+        return {"total": 0, "integrations": []}
+
+    return summarize_outbound_integrations(data)
 
+async def fetch_outbound_integrations_async() -> dict:
+    """
+    Async variant of fetch_outbound_integrations.
+    """
     try:
-        response = requests.get(WEBHOOKS_URL, headers=headers, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        data = await response_cache.get_json_async(WEBHOOKS_URL, endpoint="integrations",
+                                                   fields=WEBHOOK_INTEGRATION_FIELDS)
     except Exception as e:
         print(f"Error fetching outbound integrations: {e}")
         return {"total": 0, "integrations": []}
 
+    return summarize_outbound_integrations(data)
+
+def summarize_outbound_integrations(data: dict) -> dict:
+    """
+    Turn a webhooks list response into the deduplicated integration list.
+    """
     if data.get("status") != "success":
         print(f"API returned error: {data}")
         return {"total": 0, "integrations": []}
@@ -0,0 +1,94 @@
+import json
+import telemetry
+from apis import client, async_client, decoding
+from apis.fields import FieldSpec
+
+
+def iter_search_after_pages(url: str, payload: dict, endpoint: str = None, fields: FieldSpec = None,
+                            decode=None):
+    """
+    Yield result pages from a Moogsoft search_after endpoint as they arrive.
+
+    Only the current page is held in memory; the next request is sent when
+    the caller asks for the next page.
+
+    Args:
+        url: Endpoint to POST the search payload to.
+        payload: Search body (filter, limit, fields...). It is not modified.
+        endpoint: Client endpoint name, selects the request timeout.
+        fields: Optional FieldSpec; rows are trimmed to it right after decoding.
+        decode: Body decoder such as decoding.Decoder, defaults to decoding.loads.
+
+    Yields:
+        list[dict]: The "result" rows of each non-empty page.
+    """
+    payload = dict(payload)
+
+    while True:
+        response = client.post(url, endpoint=endpoint, data=json.dumps(payload))
+        response.raise_for_status()
+        data = (decode or decoding.loads)(response.content)
+
+        results = data.get("data", {}).get("result", [])
+        if not results:
+            break
+
+        telemetry.count("pages")
+        telemetry.count("rows", len(results))
+        if fields is not None:
+            results = fields.trim_page(results)
+        yield results
+
+        search_after = data.get("data", {}).get("search_after")
+        if not search_after:
+            break
+
+        payload["search_after"] = search_after
+
+
+def iter_search_after(url: str, payload: dict, endpoint: str = None, fields: FieldSpec = None,
+                      decode=None):
+    """
+    Yield individual records from a Moogsoft search_after endpoint.
+    See iter_search_after_pages for the paging behaviour.
+    """
+    for page in iter_search_after_pages(url, payload, endpoint=endpoint, fields=fields, decode=decode):
+        yield from page
+
+
+async def aiter_search_after_pages(url: str, payload: dict, endpoint: str = None, fields: FieldSpec = None,
+                                   decode=None):
+    """
+    Async counterpart of iter_search_after_pages.
+    """
+    payload = dict(payload)
+
+    while True:
+        data = await async_client.post_json(url, endpoint=endpoint, data=json.dumps(payload), decode=decode)
+
+        results = data.get("data", {}).get("result", [])
+        if not results:
+            break
+
+        telemetry.count("pages")
+        telemetry.count("rows", len(results))
+        if fields is not None:
+            results = fields.trim_page(results)
+        yield results
+
+        search_after = data.get("data", {}).get("search_after")
+        if not search_after:
+            break
+
+        payload["search_after"] = search_after
+
+
+async def aiter_search_after(url: str, payload: dict, endpoint: str = None, fields: FieldSpec = None,
+                             decode=None):
+    """
+    Async counterpart of iter_search_after.
+    """
+    async for page in aiter_search_after_pages(url, payload, endpoint=endpoint, fields=fields, decode=decode):
+        for record in page:
+            yield record
+
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import telemetry
+from apis import client, async_client, decoding
+from apis.fields import FieldSpec, trim_list_response
+from config import HTTP_CACHE_DIR, HTTP_CACHE_TTL
+
+# Outcomes counted in the run telemetry as cache_<outcome>
+FRESH = "fresh"                # served from the cache within HTTP_CACHE_TTL, no request
+NOT_MODIFIED = "not_modified"  # revalidated with ETag / Last-Modified, server answered 304
+UNCHANGED = "unchanged"        # full 200 response whose body hash matched the cached one
+MISS = "miss"                  # new or changed content, decoded and stored
+
+
+def cache_enabled() -> bool:
+    return bool(HTTP_CACHE_DIR)
+
+
+class ResponseCache:
+    """
+    On-disk cache of decoded JSON GET responses for slowly changing
+    inventory endpoints (integration lists, catalogs, maintenance windows).
+
+    One file per URL holds the decoded (and transformed) body together with
+    the validators needed to revalidate it: the ETag / Last-Modified headers
+    when the server sends them, and a hash of the raw body otherwise. An
+    entry younger than ttl is served without a request.
+
+    Only successful responses (no "status", or "status": "success") are
+    stored, so a failed run never pins an error for later runs.
+    """
+
+    def __init__(self, directory: str = None, ttl: float = None):
+        self.directory = directory or HTTP_CACHE_DIR
+        self.ttl = HTTP_CACHE_TTL if ttl is None else ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def load(self, url: str) -> dict | None:
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def save(self, url: str, entry: dict) -> None:
+        # Write then rename, so a concurrent reader never sees half a file
+        path = self._path(url)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def conditional_headers(self, entry: dict | None) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def settle(self, url: str, entry: dict | None, status: int, headers, body: bytes, transform) -> tuple:
+        """
+        Resolve a (possibly conditional) response against the cached entry.
+
+        Returns:
+            (data, outcome): The decoded data and one of NOT_MODIFIED / UNCHANGED / MISS.
+        """
+        if entry is not None and status == 304:
+            entry["stored_at"] = time.time()
+            self.save(url, entry)
+            return entry["data"], NOT_MODIFIED
+
+        body_hash = hashlib.sha256(body).hexdigest()
+        if entry is not None and entry.get("body_hash") == body_hash:
+            entry.update(stored_at=time.time(), etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"))
+            self.save(url, entry)
+            return entry["data"], UNCHANGED
+
+        data = decoding.loads(body)
+        if transform is not None:
+            data = transform(data)
+        if isinstance(data, dict) and data.get("status", "success") == "success":
+            self.save(url, {
+                "url": url,
+                "stored_at": time.time(),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "body_hash": body_hash,
+                "data": data
+            })
+        return data, MISS
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    """
+    The process-wide cache, or None when HTTP_CACHE_DIR is not set.
+    """
+    global _cache
+    if _cache is None and cache_enabled():
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def cache_key(url: str, fields: FieldSpec = None, trim=trim_list_response) -> str:
+    """
+    The cache key of url trimmed by trim(data, fields): the URL plus a hash of
+    the trim function and the spec, so entries trimmed under an older
+    FieldSpec are never served (or revalidated) after it changes.
+    """
+    if fields is None:
+        return url
+    variant = hashlib.sha256(f"{trim.__module__}.{trim.__qualname__}:{fields!r}".encode()).hexdigest()[:16]
+    return f"{url}#{variant}"
+
+
+def _trimmer(fields: FieldSpec = None, trim=trim_list_response):
+    return None if fields is None else lambda data: trim(data, fields)
+
+
+def get_json(url: str, endpoint: str = None, fields: FieldSpec = None, trim=trim_list_response, **kwargs):
+    """
+    GET a JSON body through the response cache (a plain GET when it is disabled).
+
+    Args:
+        url: Absolute URL, query string included; with fields, it makes up
+            the cache key (cache_key).
+        endpoint: Key into client.ENDPOINT_TIMEOUTS.
+        fields: FieldSpec a freshly decoded body is trimmed to, with
+            trim(data, fields), before it is cached and returned.
+        trim: Trims the records of the response shape, default
+            trim_list_response for {"data": [...]} lists.
+
+    Raises:
+        requests.RequestException: Connection errors and non-2xx responses.
+    """
+    cache = get_cache()
+    key = cache_key(url, fields, trim)
+    transform = _trimmer(fields, trim)
+    entry = cache.load(key) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        telemetry.count(f"cache_{FRESH}")
+        return entry["data"]
+
+    headers = {**kwargs.pop("headers", {}), **(cache.conditional_headers(entry) if cache is not None else {})}
+    response = client.get(url, endpoint=endpoint, headers=headers, **kwargs)
+    response.raise_for_status()
+
+    if cache is None:
+        data = response.json()
+        return transform(data) if transform is not None else data
+
+    data, outcome = cache.settle(key, entry, response.status_code, response.headers, response.content, transform)
+    telemetry.count(f"cache_{outcome}")
+    return data
+
+
+async def get_json_async(url: str, endpoint: str = None, fields: FieldSpec = None, trim=trim_list_response,
+                         **kwargs):
+    """
+    Async variant of get_json.
+    """
+    cache = get_cache()
+    key = cache_key(url, fields, trim)
+    transform = _trimmer(fields, trim)
+    entry = cache.load(key) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        telemetry.count(f"cache_{FRESH}")
+        return entry["data"]
+
+    headers = {**kwargs.pop("headers", {}), **(cache.conditional_headers(entry) if cache is not None else {})}
+    response = await async_client.request("GET", url, endpoint=endpoint, headers=headers, **kwargs)
+
+    if cache is None:
+        data = decoding.loads(response.body)
+        return transform(data) if transform is not None else data
+
+    data, outcome = cache.settle(key, entry, response.status, response.headers, response.body, transform)
+    telemetry.count(f"cache_{outcome}")
+    return data
@@ -1,7 +1,7 @@
-import requests
-from config import MOOGSOFT_API_KEY
+from apis import client, async_client
+from config import MOOGSOFT_BASE_URL
 
-API_URL_TEMPLATE = "https://api.moogsoft.ai/v2/stats/overview?start={start}&end={end}"
+API_URL_TEMPLATE = MOOGSOFT_BASE_URL + "/v2/stats/overview?start={start}&end={end}"
 
 def fetch_statistics(start: int, end: int) -> dict:
     """
@@ -20,15 +20,22 @@ def fetch_statistics(start: int, end: int) -> dict:
         }
     """
     url = API_URL_TEMPLATE.format(start=start, end=end)
-    headers = {
-        "apikey": MOOGSOFT_API_KEY,
-        "Content-Type": "application/json"
-    }
-
-    response = requests.get(url, headers=headers, timeout=15)
+    response = client.get(url, endpoint="stats")
     response.raise_for_status()
-    data = response.json()
+    return summarize_statistics(response.json())
+
+async def fetch_statistics_async(start: int, end: int) -> dict:
+    """
+    Async variant of fetch_statistics.
+    """
+    url = API_URL_TEMPLATE.format(start=start, end=end)
+    data = await async_client.get_json(url, endpoint="stats")
+    return summarize_statistics(data)
 
+def summarize_statistics(data: dict) -> dict:
+    """
+    Turn a stats overview response into the report statistics (see fetch_statistics).
+    """
     if data.get("status") != "success":
         raise RuntimeError(f"API returned error status: {data}")
 
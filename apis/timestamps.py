@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+# Anything above this is treated as epoch milliseconds rather than seconds
+_MS_THRESHOLD = 10 ** 11
+
+
+def to_epoch_seconds(value, formats: tuple = ()) -> float | None:
+    """
+    Normalize a Moogsoft timestamp to epoch seconds.
+
+    Args:
+        value: Epoch seconds, epoch milliseconds or a UTC date string.
+        formats: strptime formats tried, in order, for string values.
+
+    Returns:
+        float epoch seconds, or None if the value is missing or unparseable.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > _MS_THRESHOLD else float(value)
+
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return to_epoch_seconds(float(value))
+        except ValueError:
+            pass
+        for fmt in formats:
+            try:
+                return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp()
+            except ValueError:
+                continue
+
+    return None
@@ -0,0 +1,117 @@
+"""
+Benchmark of the alert and incident reducers (apis/columns.py group-bys).
+
+Feeds N synthetic records, shaped like the mock server's projected pages,
+through reduce_alerts and reduce_incidents with the report's two windows
+and prints rows per second. A pool of distinct records is generated once
+and cycled, so the records themselves cost no time or memory.
+
+With --check, a fixed 20k-row dataset is also reduced and compared with
+the summaries in bench/golden/aggregate.json (written by --save-golden),
+so optimizations of the reducers can be checked against known output.
+
+Usage:
+    python -m bench.aggregate --rows 1000000
+    python -m bench.aggregate --rows 1000000 --no-numpy   # plain-list columns
+    python -m bench.aggregate --check
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import chain, cycle, islice
+
+import apis.columns
+from apis import alerts, incidents
+from apis.fields import ALERT_SUMMARY_FIELDS, INCIDENT_SUMMARY_FIELDS
+from bench.mock_server import MockConfig, SyntheticData, _project
+
+POOL_SIZE = 50_000
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "aggregate.json")
+GOLDEN_ROWS = 20_000
+GOLDEN_NOW = 1_760_000_000
+
+# Rows the synthetic data never produces, appended to the golden dataset
+EDGE_ALERTS = [
+    {"manager": "Nagios", "event_count": 3, "tags": {"instance": "nagios-edge"}, "incidents": [1, 2]},
+    {"event_count": 2},
+    {"manager": "Zabbix", "event_count": 0, "incidents": [], "first_event_time": "2025/10/09 01:02:03 AM"},
+]
+EDGE_INCIDENTS = [
+    {"tags": {"manager": ["Splunk A", "Splunk B"], "SNOWInc": "  ", "cmdb_ci": "", "Workload": "splunk-workload"}},
+    {"tags": None},
+    {"created_at": "2025-10-09 01:00:00", "tags": {"manager": "Dynatrace", "Workload": "dt-workload", "source": " "}},
+    {"tags": {"manager": "Dynatrace", "cmdb_ci": None, "Workload": "", "source": "edge-source"}},
+    {"tags": {"manager": 5, "SNOWIncidentCreated": "error", "upgraded": "yes", "auto_close": "1", "source": "s"}},
+]
+
+
+def record_stream(make, spec, rows: int):
+    pool = [_project(make(i), spec.payload_fields()) for i in range(min(rows, POOL_SIZE))]
+    return islice(cycle(pool), rows)
+
+
+def golden_summaries() -> dict:
+    """
+    Alert and incident summaries of a fixed dataset, in comparable form.
+    """
+    data = SyntheticData(MockConfig(alerts=GOLDEN_ROWS, incidents=GOLDEN_ROWS), now=GOLDEN_NOW)
+    windows = {"this_month": data.oldest + 24 * 60 * 60, "last_24h": data.now - 24 * 60 * 60}
+    alert_summary = alerts.reduce_alerts(
+        chain(record_stream(data.alert, ALERT_SUMMARY_FIELDS, GOLDEN_ROWS), EDGE_ALERTS),
+        windows, default_time=windows["this_month"]
+    )
+    incident_summary = incidents.reduce_incidents(
+        chain(record_stream(data.incident, INCIDENT_SUMMARY_FIELDS, GOLDEN_ROWS), EDGE_INCIDENTS),
+        windows, default_time=windows["this_month"]
+    )
+    # source_tags is collected as a set, its order carries no meaning
+    for summary in incident_summary.values():
+        blank = summary["cmdb_ci_blank_workload_blank"]
+        blank["source_tags"] = sorted(blank["source_tags"])
+    return json.loads(json.dumps({"alerts": alert_summary, "incidents": incident_summary}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the alert and incident reducers.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Records per dataset (default: 1000000)")
+    parser.add_argument("--no-numpy", action="store_true", help="Use plain-list columns even if NumPy is installed")
+    parser.add_argument("--check", action="store_true", help="Compare the reducers' output with the golden file")
+    parser.add_argument("--save-golden", action="store_true", help="Overwrite the golden file with the current output")
+    args = parser.parse_args()
+
+    if args.no_numpy:
+        apis.columns.np = None
+
+    if args.save_golden:
+        os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+        with open(GOLDEN_PATH, "w") as f:
+            json.dump(golden_summaries(), f, indent=1, sort_keys=True)
+        print(f"Golden summaries written to {GOLDEN_PATH}")
+        sys.exit(0)
+
+    if args.check:
+        with open(GOLDEN_PATH) as f:
+            golden = json.load(f)
+        current = golden_summaries()
+        mismatched = [name for name in golden if current.get(name) != golden[name]]
+        if mismatched:
+            print(f"Output differs from {GOLDEN_PATH}: {', '.join(mismatched)}")
+            sys.exit(1)
+        print(f"Output matches {GOLDEN_PATH}")
+
+    data = SyntheticData(MockConfig(alerts=POOL_SIZE, incidents=POOL_SIZE))
+    windows = {"this_month": data.oldest, "last_24h": data.now - 24 * 60 * 60}
+    datasets = [
+        ("alerts", alerts.reduce_alerts, record_stream(data.alert, ALERT_SUMMARY_FIELDS, args.rows)),
+        ("incidents", incidents.reduce_incidents, record_stream(data.incident, INCIDENT_SUMMARY_FIELDS, args.rows)),
+    ]
+
+    print(f"columns: {'lists' if apis.columns.np is None else 'numpy'}")
+    print(f"{'dataset':<10} {'rows':>10} {'seconds':>8} {'rows/s':>10}")
+    for name, reduce, records in datasets:
+        t0 = time.perf_counter()
+        reduce(records, windows, default_time=windows["this_month"])
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<10} {args.rows:>10} {elapsed:>8.2f} {args.rows / elapsed:>10,.0f}")
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the JSON decoders in apis/decoding.py on one search page.
+
+Builds a page of synthetic alerts, incidents and maintenance alerts (as
+bench/mock_server.py would serve it) and times every installed backend,
+with and without the record schema, in milliseconds per page.
+
+Usage:
+    python -m bench.decode --rows 5000 --repeat 20
+    python -m bench.decode --unprojected   # pages as if "fields" were ignored
+"""
+import argparse
+import json
+import time
+
+from apis.decoding import Decoder, available_backends
+from apis.fields import ALERT_SUMMARY_FIELDS, INCIDENT_SUMMARY_FIELDS, MAINTENANCE_ALERT_FIELDS
+from bench.mock_server import MockConfig, SyntheticData, _project
+
+DATASETS = {
+    "alerts": ("alert", ALERT_SUMMARY_FIELDS),
+    "incidents": ("incident", INCIDENT_SUMMARY_FIELDS),
+    "maintenance": ("maintenance_alert", MAINTENANCE_ALERT_FIELDS),
+}
+
+
+def build_page(dataset: str, rows: int, projected: bool) -> bytes:
+    make_name, spec = DATASETS[dataset]
+    make = getattr(SyntheticData(MockConfig(alerts=rows, incidents=rows, maintenance_alerts=rows)), make_name)
+    wanted = spec.payload_fields() if projected else None
+    return json.dumps({"status": "success", "data": {
+        "result": [_project(make(i), wanted) for i in range(rows)],
+        "search_after": [rows]
+    }}).encode()
+
+
+def time_decoder(decode, body: bytes, repeat: int) -> float:
+    """
+    Best of `repeat` decodes of body, in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        decode(body)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare JSON decoders on one Moogsoft search page.")
+    parser.add_argument("--rows", type=int, default=5000, help="Records per page (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Decodes per measurement, best is kept")
+    parser.add_argument("--unprojected", action="store_true",
+                        help="Keep every record field, as if the server ignored the \"fields\" projection")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    decoders = [(backend, False) for backend in backends]
+    if "msgspec" in backends:
+        decoders.insert(1, ("msgspec", True))
+
+    print(f"{'dataset':<12} {'page KB':>8}" + "".join(
+        f"{backend + (' typed' if typed else ''):>15}" for backend, typed in decoders))
+    for dataset, (_, spec) in DATASETS.items():
+        body = build_page(dataset, args.rows, projected=not args.unprojected)
+        timings = [
+            time_decoder(Decoder(spec if typed else None, backend=backend), body, args.repeat)
+            for backend, typed in decoders
+        ]
+        print(f"{dataset:<12} {len(body) / 1e3:>8.1f}" + "".join(f"{ms:>12.2f} ms" for ms in timings))
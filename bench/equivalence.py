@@ -0,0 +1,181 @@
+"""
+Equivalence check of the single-pass alert aggregation (apis/alerts.py).
+
+aggregate_alerts fetches alerts once from the earliest window start and
+buckets them into the month and 24h windows. The report used to fetch the
+month and the last 24h separately and summarize each list. This check
+serves a fixed dataset from an in-process fake of the paginated alerts
+search, runs both paths against it and compares their summaries.
+
+One difference is intended and pinned here: an alert whose first_event_time
+cannot be parsed is assumed to be as old as the fetch start, so it is only
+counted in the month window. The server knows its real time, so the old
+24h fetch also returned and counted it.
+
+Usage:
+    python -m bench.equivalence
+"""
+import json
+import sys
+from unittest import mock
+
+from apis import alerts, pagination
+from apis.timestamps import to_epoch_seconds
+
+NOW = 1_760_000_000
+MONTH_START = NOW - 20 * 24 * 60 * 60
+DAY_START = NOW - 24 * 60 * 60
+# Smaller than the payload limit, so both paths read many pages
+PAGE_SIZE = 70
+MANAGERS = ("Nagios", "Dynatrace", "Splunk Enterprise", "Prometheus")
+
+
+def dataset() -> list:
+    """
+    Alerts as (server time, record) pairs: spread over the month, a few
+    exactly on the window starts, and rows with unusual fields.
+    """
+    times = [MONTH_START + k * 1733 for k in range((NOW - MONTH_START) // 1733)] + [MONTH_START, DAY_START, DAY_START]
+    rows = []
+    for i, server_time in enumerate(sorted(times)):
+        manager = MANAGERS[i % len(MANAGERS)]
+        record = {
+            "alert_id": i + 1,
+            "manager": manager,
+            "event_count": 1 + i % 9,
+            "incidents": [] if i % 3 == 0 else [i],
+            "tags": {"instance": f"nagios-{i % 5}"} if manager == "Nagios" and i % 4 else {},
+            "check": f"check-{i % 11}",
+            "first_event_time": alerts.epoch_to_moogsoft_format(server_time)
+        }
+        if i % 50 == 7:
+            del record["manager"]
+        rows.append((server_time, record))
+    return rows
+
+
+def unparseable_alerts() -> list:
+    """
+    Alerts whose first_event_time the client cannot parse, from the last
+    24h and from earlier in the month.
+    """
+    return [
+        (NOW - 3600, {"alert_id": 9001, "manager": "Nagios", "event_count": 4, "incidents": [],
+                      "tags": {"instance": "nagios-x"}, "first_event_time": "yesterday"}),
+        (NOW - 7200, {"alert_id": 9002, "manager": "Zabbix", "event_count": 2, "incidents": [1]}),
+        (MONTH_START + 3600, {"alert_id": 9003, "manager": "Zabbix", "event_count": 5, "incidents": [],
+                              "first_event_time": ""}),
+    ]
+
+
+class FakeAlertsSearch:
+    """
+    Stand-in for client.post on the alerts search: applies the
+    first_event_time >= filter to the server times and pages with search_after.
+    """
+
+    def __init__(self, rows: list):
+        self.rows = sorted(rows, key=lambda row: row[0])
+        self.requests = 0
+
+    def __call__(self, url, endpoint=None, data=None, **kwargs):
+        self.requests += 1
+        payload = json.loads(data)
+        start_string = payload["filter"].split('"')[1]
+        start = to_epoch_seconds(start_string, alerts.MOOGSOFT_TIME_FORMATS)
+        matching = [record for server_time, record in self.rows if server_time >= start]
+
+        first = (payload.get("search_after") or [0])[0]
+        last = min(first + min(payload.get("limit", PAGE_SIZE), PAGE_SIZE), len(matching))
+        fields = payload.get("fields")
+        result = [{key: record[key] for key in fields if key in record} for record in matching[first:last]]
+        body = {"status": "success", "data": {
+            "result": result,
+            "search_after": [last] if last < len(matching) else None
+        }}
+        return mock.Mock(content=json.dumps(body).encode(), raise_for_status=lambda: None)
+
+
+def summarize_two_fetch(alerts_list: list) -> tuple:
+    """
+    The summary of the previous two-fetch implementation, for one fetched list.
+    """
+    per_manager = {}
+    nagios_tags = {}
+    for alert in alerts_list:
+        manager = alert.get("manager", "Unknown")
+        event_count = alert.get("event_count", 0)
+        mgr_data = per_manager.setdefault(manager, {"alerts": 0, "events": 0, "no_incident_events": 0})
+        mgr_data["alerts"] += 1
+        mgr_data["events"] += event_count
+        if not alert.get("incidents", []):
+            mgr_data["no_incident_events"] += event_count
+        tags = alert.get("tags", {})
+        if manager == "Nagios" and "instance" in tags:
+            nagios_tags[tags["instance"]] = nagios_tags.get(tags["instance"], 0) + event_count
+    return per_manager, nagios_tags
+
+
+def two_fetch(month_alerts: list, day_alerts: list) -> dict:
+    month_summary, month_nagios = summarize_two_fetch(month_alerts)
+    day_summary, day_nagios = summarize_two_fetch(day_alerts)
+    return {
+        "per_manager": {"this_month": month_summary, "last_24h": day_summary},
+        "nagios": {"this_month": month_nagios, "last_24h": day_nagios}
+    }
+
+
+def comparable(summary: dict) -> dict:
+    """
+    Summary with dict order dropped and numbers as plain ints.
+    """
+    return json.loads(json.dumps(summary, sort_keys=True, default=int))
+
+
+def run_both(rows: list) -> tuple:
+    """
+    Summaries of the two-fetch and single-pass paths over the fake API.
+
+    Returns:
+        (two_fetch_summary, single_pass_summary, month_alerts, day_alerts)
+    """
+    fake = FakeAlertsSearch(rows)
+    with mock.patch.object(pagination.client, "post", fake), mock.patch.object(alerts, "store_enabled", lambda: False):
+        month_alerts = alerts.fetch_alerts_since(MONTH_START)
+        day_alerts = alerts.fetch_alerts_since(DAY_START)
+        single_pass = alerts.aggregate_alerts(MONTH_START, DAY_START)
+    return comparable(two_fetch(month_alerts, day_alerts)), comparable(single_pass), month_alerts, day_alerts
+
+
+def check() -> list:
+    """
+    Returns:
+        list of failure descriptions, empty when both paths agree.
+    """
+    failures = []
+
+    # Every time parseable: identical output
+    reference, single_pass, _, _ = run_both(dataset())
+    if single_pass != reference:
+        failures.append("parseable alerts: single-pass summary differs from the two-fetch summary")
+
+    # Unparseable times: the month window is unchanged, the 24h window leaves
+    # out exactly the alerts the client could not place in it
+    reference, single_pass, month_alerts, day_alerts = run_both(dataset() + unparseable_alerts())
+    placed = [alert for alert in day_alerts if alerts.alert_time(alert) is not None]
+    expected = comparable(two_fetch(month_alerts, placed))
+    if single_pass != expected:
+        failures.append("unparseable times: single-pass summary is not the two-fetch summary "
+                        "without those alerts in the 24h window")
+    if single_pass["per_manager"]["last_24h"] == reference["per_manager"]["last_24h"]:
+        failures.append("unparseable times: expected the 24h window to differ from the two-fetch summary")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check()
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+    print("Single-pass alert aggregation matches the two-fetch implementation")
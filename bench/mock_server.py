@@ -0,0 +1,573 @@
+"""
+Local stand-in for the Moogsoft API, for benchmarking without production.
+
+Serves every endpoint the apis package calls from synthetic data that is
+generated per request from the record index, so volumes like 1M alerts
+cost no memory. Latency, jitter and a 503 error rate can be injected.
+
+It can also record a real tenant once (--record DIR --upstream URL) and
+replay those responses later (--replay DIR).
+
+Usage:
+    python -m bench.mock_server --port 8080 --alerts 1000000 --inbound 500
+    MOOGSOFT_BASE_URL=http://127.0.0.1:8080 python main.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+MANAGERS = ["Nagios", "Dynatrace", "Prometheus", "Splunk Enterprise", "AppDynamics", "Zabbix"]
+INTEGRATION_TYPES = ["DYNATRACE", "NAGIOS", "PROMETHEUS", "CUSTOM"]
+AUDIT_SERVICE_NAMES = [
+    "ums-apikey", "ums-sso", "ums-role", "maintenance-windows",
+    "catalogs", "workflows", "correlation-engine", "correlation-engine-webserver",
+    "webhooks", "notification-policies", "byoapi"
+]
+ALERT_TIME_FORMAT = "%Y/%m/%d %I:%M:%S %p"
+INCIDENT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass
+class MockConfig:
+    """
+    Synthetic tenant size and server behaviour.
+
+    Attributes:
+        alerts / incidents: Records spread evenly over the last `days` days.
+        inbound_integrations / outbound_integrations: BYOAPI and webhook counts.
+        errors_per_integration: Error / log records per integration.
+        catalogs / maintenance_windows / maintenance_alerts: Other volumes.
+        days: Age of the oldest synthetic record.
+        latency: Seconds added to every response.
+        jitter: Extra random latency, uniform in [0, jitter] seconds.
+        error_rate: Fraction of requests answered with 503.
+        seed: Seed of the latency / error randomness and of the data.
+    """
+    alerts: int = 100_000
+    incidents: int = 20_000
+    inbound_integrations: int = 50
+    outbound_integrations: int = 20
+    errors_per_integration: int = 20
+    catalogs: int = 10
+    maintenance_windows: int = 50
+    maintenance_alerts: int = 2_000
+    days: int = 45
+    latency: float = 0.02
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+def _pick(index: int, salt: int, n: int) -> int:
+    """
+    Cheap deterministic pseudo-random choice in [0, n) for a record field.
+    """
+    return ((index + 1) * 2654435761 + salt * 40503) % 4294967296 % n
+
+
+class SyntheticData:
+    """
+    Synthetic Moogsoft tenant. Record i of a dataset is a pure function of
+    i, and records are ordered by time, so a search only has to compute
+    the index range of the requested page.
+    """
+
+    def __init__(self, config: MockConfig, now: float = None):
+        self.config = config
+        self.now = now or time.time()
+        self.oldest = self.now - config.days * 24 * 60 * 60
+
+    # Time <-> index for datasets spread evenly over [oldest, now)
+
+    def _time(self, index: int, count: int) -> float:
+        return self.oldest + (self.now - self.oldest) * index / max(count, 1)
+
+    def _first_index(self, since: float, count: int) -> int:
+        if since <= self.oldest:
+            return 0
+        step = (self.now - self.oldest) / max(count, 1)
+        index = int((since - self.oldest) // step)
+        while index < count and self._time(index, count) < since:
+            index += 1
+        return min(index, count)
+
+    # Records
+
+    def alert(self, i: int) -> dict:
+        salt = self.config.seed
+        manager = MANAGERS[_pick(i, salt + 1, len(MANAGERS))]
+        tags = {"configurationItem": f"ci-{i % 500}", "location": f"dc-{_pick(i, salt + 6, 4)}"}
+        if manager == "Nagios":
+            tags["instance"] = f"nagios-{_pick(i, salt + 4, 40):02d}"
+        first_event_time = int(self._time(i, self.config.alerts))
+        return {
+            "alert_id": i + 1,
+            "manager": manager,
+            "event_count": 1 + _pick(i, salt + 2, 20),
+            "incidents": [] if _pick(i, salt + 3, 4) == 0 else [i // 7 + 1 + k for k in range(1 + i % 3)],
+            "tags": tags,
+            "check": f"check-{_pick(i, salt + 5, 100)}",
+            "first_event_time": first_event_time,
+            # Fields the real API returns but the report never reads
+            **_filler(i, first_event_time)
+        }
+
+    def incident(self, i: int) -> dict:
+        salt = self.config.seed
+
+        def maybe(value, salt_offset, one_in):
+            return value if _pick(i, salt + salt_offset, one_in) == 0 else None
+
+        created_at = int(self._time(i, self.config.incidents))
+        return {
+            "incident_id": i + 1,
+            "created_at": created_at,
+            **_filler(i, created_at),
+            "tags": {
+                "location": f"dc-{_pick(i, salt + 6, 4)}",
+                "environment": "production",
+                "manager": MANAGERS[_pick(i, salt + 11, len(MANAGERS))],
+                "SNOWInc": f"INC{i:07d}" if _pick(i, salt + 12, 3) else "",
+                "SNOWIncidentCreated": maybe("error", 13, 30),
+                "upgraded": maybe("true", 14, 10),
+                "auto_close": maybe("true", 15, 4),
+                "cmdb_ci": f"ci-{i % 500}" if _pick(i, salt + 16, 3) else None,
+                "Workload": f"workload-{_pick(i, salt + 17, 60)}" if _pick(i, salt + 18, 2) else "",
+                "source": maybe(f"source-{_pick(i, salt + 19, 8)}", 20, 2)
+            }
+        }
+
+    def maintenance_alert(self, i: int) -> dict:
+        return {
+            "alert_id": 10_000_000 + i,
+            "manager": MANAGERS[_pick(i, self.config.seed + 21, len(MANAGERS))],
+            "incidents": [],
+            "maintenance": f"mw-{i % max(self.config.maintenance_windows, 1)}",
+            "created_at": int(self._time(i, self.config.maintenance_alerts)),
+            **_filler(i, int(self._time(i, self.config.maintenance_alerts)))
+        }
+
+    # Endpoints
+
+    def stats(self) -> dict:
+        return {"status": "success", "data": {
+            "event_count": self.config.alerts * 3,
+            "alert_count": self.config.alerts,
+            "incident_count": self.config.incidents
+        }}
+
+    def byoapi(self, integration_type: str = None) -> dict:
+        items = []
+        for i in range(self.config.inbound_integrations):
+            kind = INTEGRATION_TYPES[i % len(INTEGRATION_TYPES)]
+            if integration_type is None or integration_type == kind:
+                items.append({
+                    "id": f"byoapi-{i}", "endpointName": f"{kind.title()} {i}", "integration": kind,
+                    "description": f"{kind.title()} events from region {i % 7}",
+                    "mapping": {"source": "$.host", "check": "$.check", "severity": "$.severity",
+                                "description": "$.message", "tags": "$.labels"},
+                    "createdBy": "admin@example.com", "createdAt": int(self.now * 1000)
+                })
+        return {"status": "success", "data": items}
+
+    def byoapi_errors(self, integration_id: str) -> dict:
+        return {"status": "success", "data": [
+            {"timestamp": int((self.now - k * 3 * 60 * 60) * 1000), "errors": [f"reason {k % 5}"],
+             "payload": {"host": f"host-{k}", "check": "disk", "message": "event rejected by mapping"}}
+            for k in range(self.config.errors_per_integration)
+        ]}
+
+    def webhooks(self) -> dict:
+        return {"status": "success", "data": [
+            {
+                "id": f"webhook-{i}", "name": f"Webhook {i}",
+                "url": f"https://hooks.example.com/moogsoft/{i}", "method": "POST",
+                "headers": {"Content-Type": "application/json", "Authorization": "Bearer ****"},
+                "body": '{"incident": "$incident_id", "status": "$status", "description": "$description"}',
+                "enabled": True
+            }
+            for i in range(self.config.outbound_integrations)
+        ]}
+
+    def webhook_logs(self, integration_id: str) -> dict:
+        return {"status": "success", "data": [
+            {"timestamp": int((self.now - k * 3 * 60 * 60) * 1000),
+             "message": f"HTTP 500 from target {k % 7}, request {integration_id}-{k:08x}",
+             "request": {"url": f"https://hooks.example.com/moogsoft/{k % 7}", "method": "POST"}}
+            for k in range(self.config.errors_per_integration)
+        ]}
+
+    def catalogs(self) -> dict:
+        return {"status": "success", "data": [
+            {
+                "name": f"catalog-{i}", "entries": 100 * (i + 1), "last_updated": int((self.now - i * 6 * 60 * 60) * 1000),
+                "description": f"CMDB extract {i}", "key": "configurationItem",
+                "columns": ["configurationItem", "owner", "location", "support_group", "environment"]
+            }
+            for i in range(self.config.catalogs)
+        ]}
+
+    def maintenance_windows(self) -> dict:
+        return {"status": "success", "data": {"result": [
+            {
+                "start": int((self.now - i * 12 * 60 * 60) * 1000),
+                "duration": 4 * 60 * 60 * 1000,
+                "filter": f"tags.configurationItem in ('ci-{i}', 'ci-{i + 1}')",
+                "name": f"Patch window {i}", "description": "Monthly OS patching",
+                "recurrence": {"frequency": "weekly", "count": 4}
+            }
+            for i in range(self.config.maintenance_windows)
+        ]}}
+
+    def audit_count(self, service: str) -> int:
+        return int(hashlib.md5(service.encode()).hexdigest(), 16) % 25
+
+    def audits(self, service: str) -> dict:
+        if service:
+            return {"status": "success", "data": {"count": self.audit_count(service)}}
+        # Unfiltered query: every audit record, tagged with its service
+        result = [
+            {"serviceName": name, "action": "update", "timestamp": int(self.now * 1000) - i * 60_000}
+            for name in AUDIT_SERVICE_NAMES for i in range(self.audit_count(name))
+        ]
+        return {"status": "success", "data": {"count": len(result), "result": result}}
+
+    def search_after(self, make, count: int, since: float, payload: dict) -> dict:
+        """
+        One search_after page of make(i) for records at or after `since`.
+        """
+        limit = payload.get("limit", 5000)
+        cursor = payload.get("search_after")
+        first = cursor[0] if cursor else self._first_index(since, count)
+        last = min(first + limit, count)
+        result = [_project(make(i), payload.get("fields")) for i in range(first, last)]
+        return {"status": "success", "data": {
+            "result": result,
+            "search_after": [last] if last < count else None
+        }}
+
+    def alerts_search(self, payload: dict) -> dict:
+        json_filter = payload.get("jsonFilter") or {}
+        if "maintenance" in json_filter:
+            since = (json_filter.get("created_at") or {}).get("filter", 0)
+            return self.search_after(self.maintenance_alert, self.config.maintenance_alerts, since, payload)
+
+        since = 0
+        match = re.search(r'first_event_time\s*>=\s*"([^"]+)"', payload.get("filter", ""))
+        if match:
+            since = _parse_time(match.group(1), ALERT_TIME_FORMAT)
+        return self.search_after(self.alert, self.config.alerts, since, payload)
+
+    def incidents_search(self, payload: dict) -> dict:
+        since = 0
+        created_at = (payload.get("json_filter") or {}).get("created_at") or {}
+        date_from = (created_at.get("condition2") or {}).get("condition1", {}).get("dateFrom")
+        if date_from:
+            since = _parse_time(date_from, INCIDENT_TIME_FORMAT)
+        return self.search_after(self.incident, self.config.incidents, since, payload)
+
+
+def _filler(i: int, timestamp: int) -> dict:
+    """
+    Descriptive fields real alerts / incidents carry that the report ignores.
+    """
+    return {
+        "description": f"Synthetic condition {i % 97} detected on host-{i % 500}",
+        "severity": ["Clear", "Warning", "Minor", "Major", "Critical"][i % 5],
+        "status": ["Open", "In Progress", "Resolved", "Closed"][i % 4],
+        "service": [f"service-{i % 30}"],
+        "source": f"host-{i % 500}.example.com",
+        "class": "Infrastructure",
+        "type": "Availability",
+        "last_event_time": timestamp + i % 600,
+        "assignee": None
+    }
+
+
+def _project(record: dict, wanted: list | None) -> dict:
+    if not wanted:
+        return record
+    return {key: record[key] for key in wanted if key in record}
+
+
+def _parse_time(value: str, fmt: str) -> float:
+    return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp()
+
+
+# (method, path regex, section, handler(data, match, query, payload))
+ROUTES = [
+    ("GET", r"/v2/stats/overview", "statistics", lambda d, m, q, p: d.stats()),
+    ("GET", r"/v1/integrations/byoapi/([^/]+)/errors", "inbound_errors",
+     lambda d, m, q, p: d.byoapi_errors(m.group(1))),
+    ("GET", r"/v1/integrations/byoapi", "inbound_integrations",
+     lambda d, m, q, p: d.byoapi(q.get("integration", [None])[0])),
+    ("GET", r"/v2/integrations/webhooks/logs/([^/]+)", "outbound_errors",
+     lambda d, m, q, p: d.webhook_logs(m.group(1))),
+    ("GET", r"/v2/integrations/webhooks/items", "outbound_integrations", lambda d, m, q, p: d.webhooks()),
+    ("GET", r"/v2/catalogs", "catalogs", lambda d, m, q, p: d.catalogs()),
+    ("GET", r"/v1/maintenance/windows", "maintenance", lambda d, m, q, p: d.maintenance_windows()),
+    ("GET", r"/v1/audits", "audits", lambda d, m, q, p: d.audits(q.get("serviceName", [""])[0])),
+    ("POST", r"/v1/alerts", "alerts", lambda d, m, q, p: d.alerts_search(p)),
+    ("POST", r"/v1/incidents", "incidents", lambda d, m, q, p: d.incidents_search(p)),
+]
+
+
+def route_section(method: str, path: str, payload: dict = None) -> str:
+    """
+    Report section a request belongs to, used for per-section request counts.
+    """
+    if method == "POST" and path == "/v1/alerts" and "maintenance" in ((payload or {}).get("jsonFilter") or {}):
+        return "maintenance"
+    for route_method, pattern, section, _ in ROUTES:
+        if route_method == method and re.fullmatch(pattern, path):
+            return section
+    return "unknown"
+
+
+class Recording:
+    """
+    Responses recorded from a real tenant, keyed by request with timestamps
+    masked out. Repeated keys (pages of one search) replay in recorded order.
+    """
+    _TIMES = re.compile(r"\d{4}[-/]\d{2}[-/]\d{2}[ T]\d{2}:\d{2}:\d{2}(?: [AP]M)?|\b1\d{9,12}\b")
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, "recording.jsonl")
+        self.lock = threading.Lock()
+        self.responses = {}
+        self.positions = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.responses.setdefault(entry["key"], []).append(entry)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def key(cls, method: str, path: str, body: bytes) -> str:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True) if body else ""
+        except ValueError:
+            body = body.decode(errors="replace")
+        return cls._TIMES.sub("<time>", f"{method} {path} {body}")
+
+    def append(self, key: str, status: int, body: bytes) -> None:
+        entry = {"key": key, "status": status, "body": body.decode()}
+        with self.lock:
+            self.responses.setdefault(key, []).append(entry)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def next(self, key: str) -> dict | None:
+        with self.lock:
+            entries = self.responses.get(key)
+            if not entries:
+                return None
+            position = self.positions.get(key, 0)
+            self.positions[key] = position + 1
+            return entries[position % len(entries)]
+
+    def rewind(self) -> None:
+        with self.lock:
+            self.positions.clear()
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig, recording: Recording = None,
+                 upstream: str = None, record: bool = False):
+        super().__init__(address, MockHandler)
+        self.config = config
+        self.data = SyntheticData(config)
+        self.recording = recording
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.record = record
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests = {}
+            self.injected_errors = {}
+            self.bytes_sent = {}
+        if self.recording is not None:
+            self.recording.rewind()
+
+    def count(self, section: str, size: int, injected: bool) -> None:
+        with self.lock:
+            self.requests[section] = self.requests.get(section, 0) + 1
+            self.bytes_sent[section] = self.bytes_sent.get(section, 0) + size
+            if injected:
+                self.injected_errors[section] = self.injected_errors.get(section, 0) + 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "injected_errors": dict(self.injected_errors),
+                "bytes": dict(self.bytes_sent)
+            }
+
+    def delay_and_fail(self) -> bool:
+        """
+        Sleep for the configured latency; returns True if this request should fail.
+        """
+        with self.lock:
+            delay = self.config.latency + self.random.uniform(0, self.config.jitter)
+            fail = self.random.random() < self.config.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MockServer
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _send(self, status: int, body: bytes, headers: dict = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str) -> None:
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        # Control endpoints used by the benchmark runner
+        if url.path == "/_mock/stats":
+            return self._send(200, json.dumps(self.server.stats()).encode())
+        if url.path == "/_mock/reset":
+            self.server.reset()
+            return self._send(200, b"{}")
+
+        try:
+            payload = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            payload = {}
+        section = route_section(method, url.path, payload)
+
+        if self.server.delay_and_fail():
+            body = b'{"status":"error","message":"injected failure"}'
+            self.server.count(section, len(body), injected=True)
+            return self._send(503, body, {"Retry-After": "0"})
+
+        if self.server.recording is not None:
+            status, body = self._recorded(method, raw_body)
+        else:
+            status, body = self._synthetic(method, url, payload)
+
+        # Validators for GET responses, so clients can revalidate with If-None-Match
+        headers = {}
+        if method == "GET" and status == 200:
+            headers["ETag"] = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                status, body = 304, b""
+
+        self.server.count(section, len(body), injected=False)
+        self._send(status, body, headers)
+
+    def _synthetic(self, method: str, url, payload: dict) -> tuple:
+        query = parse_qs(url.query)
+        for route_method, pattern, _, handler in ROUTES:
+            match = re.fullmatch(pattern, url.path)
+            if route_method == method and match:
+                return 200, json.dumps(handler(self.server.data, match, query, payload)).encode()
+        return 404, json.dumps({"status": "error", "message": f"No mock for {method} {url.path}"}).encode()
+
+    def _recorded(self, method: str, raw_body: bytes) -> tuple:
+        recording = self.server.recording
+        key = Recording.key(method, self.path, raw_body)
+
+        if self.server.record:
+            import requests
+            response = requests.request(
+                method, self.server.upstream + self.path, data=raw_body or None, timeout=120,
+                headers={"apikey": os.getenv("MOOGSOFT_API_KEY", ""), "Content-Type": "application/json"}
+            )
+            recording.append(key, response.status_code, response.content)
+            return response.status_code, response.content
+
+        entry = recording.next(key)
+        if entry is None:
+            return 404, json.dumps({"status": "error", "message": f"Not recorded: {key}"}).encode()
+        return entry["status"], entry["body"].encode()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add one --option per MockConfig field (shared with bench/run.py).
+    """
+    for f in fields(MockConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default,
+                            help=f"(default: {f.default})")
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(**{f.name: getattr(args, f.name) for f in fields(MockConfig)})
+
+
+def config_to_argv(config: MockConfig) -> list:
+    argv = []
+    for f in fields(MockConfig):
+        argv += [f"--{f.name.replace('_', '-')}", str(getattr(config, f.name))]
+    return argv
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Moogsoft API for local benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    parser.add_argument("--record", metavar="DIR", help="Proxy to --upstream and record the responses into DIR")
+    parser.add_argument("--replay", metavar="DIR", help="Serve responses recorded with --record")
+    parser.add_argument("--upstream", default="https://api.moogsoft.ai", help="Real API used with --record")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.record and args.replay:
+        parser.error("--record and --replay are exclusive")
+
+    directory = args.record or args.replay
+    recording = Recording(directory) if directory else None
+    if args.replay and not recording.responses:
+        parser.error(f"Nothing recorded in {args.replay}")
+
+    server = MockServer((args.host, args.port), config_from_args(args), recording=recording,
+                        upstream=args.upstream, record=bool(args.record))
+    print(f"Mock Moogsoft API listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
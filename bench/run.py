@@ -0,0 +1,135 @@
+"""
+End-to-end benchmark of main.main() against the mock Moogsoft API.
+
+Starts bench/mock_server.py in a subprocess (or uses --url), then runs the
+whole report once per engine and repeat, each in a fresh process with the
+email step stubbed out, and prints wall time, peak RSS and the number of
+API requests per section.
+
+Usage:
+    python -m bench.run --alerts 1000000 --inbound-integrations 500 --engine threads --engine async
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+import urllib.request
+
+from bench.mock_server import add_config_arguments, config_from_args, config_to_argv
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_mock_server(argv: list) -> tuple:
+    """
+    Start the mock server on a free port.
+
+    Returns:
+        (process, base_url)
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bench.mock_server", "--port", "0", *argv],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    if "listening on" not in line:
+        process.kill()
+        raise RuntimeError(f"Mock server failed to start: {line!r}")
+    return process, line.rsplit(" ", 1)[-1].strip()
+
+
+def control(base_url: str, action: str) -> dict:
+    method = "POST" if action == "reset" else "GET"
+    with urllib.request.urlopen(urllib.request.Request(f"{base_url}/_mock/{action}", method=method)) as response:
+        return json.loads(response.read())
+
+
+def run_once(engine: str, workers: int | None, verbose: bool) -> dict:
+    """
+    Run main.main() once. Executed in a fresh child process so peak RSS
+    belongs to this run only.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    import main
+
+    main.send_email = lambda subject, html_body, **kwargs: None
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        t0 = time.perf_counter()
+        main.main(max_workers=workers, engine=engine)
+        wall = time.perf_counter() - t0
+
+    # ru_maxrss is in KiB on Linux
+    return {"wall_seconds": wall, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def print_report(runs: list) -> None:
+    sections = sorted({section for run in runs for section in run["requests"]})
+
+    print(f"{'engine':<8} {'run':>3} {'wall s':>8} {'peak RSS MB':>12} {'requests':>9} {'errors':>7} {'MB sent':>8}")
+    for run in runs:
+        print(f"{run['engine']:<8} {run['repeat']:>3} {run['wall_seconds']:>8.2f} {run['peak_rss_mb']:>12.1f} "
+              f"{sum(run['requests'].values()):>9} {sum(run['injected_errors'].values()):>7} "
+              f"{sum(run['bytes'].values()) / 1e6:>8.2f}")
+
+    print()
+    print(f"{'requests per section':<24}" + "".join(f"{run['engine'] + '#' + str(run['repeat']):>12}" for run in runs))
+    for section in sections:
+        print(f"{section:<24}" + "".join(f"{run['requests'].get(section, 0):>12}" for run in runs))
+
+    print()
+    print(f"{'KB sent per section':<24}" + "".join(f"{run['engine'] + '#' + str(run['repeat']):>12}" for run in runs))
+    for section in sections:
+        print(f"{section:<24}" + "".join(f"{run['bytes'].get(section, 0) / 1e3:>12.1f}" for run in runs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the report against the mock Moogsoft API.")
+    parser.add_argument("--engine", choices=["threads", "async"], action="append",
+                        help="Engine to benchmark, repeatable (default: threads)")
+    parser.add_argument("--workers", type=int, default=None, help="Threads engine section concurrency")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per engine")
+    parser.add_argument("--url", help="Use an already running mock server instead of starting one")
+    parser.add_argument("--store", metavar="PATH", default="",
+                        help="Enable the incremental store at PATH (default: disabled)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show the report's own output")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = start_mock_server(config_to_argv(config_from_args(args)))
+
+    # Inherited by the child processes, read by config.py on import
+    os.environ["MOOGSOFT_BASE_URL"] = base_url
+    os.environ["MOOGSOFT_STORE_PATH"] = args.store
+    os.environ.setdefault("MOOGSOFT_API_KEY", "bench")
+
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    try:
+        for engine in args.engine or ["threads"]:
+            for repeat in range(1, args.repeat + 1):
+                control(base_url, "reset")
+                with context.Pool(1, maxtasksperchild=1) as pool:
+                    result = pool.apply(run_once, (engine, args.workers, args.verbose))
+                stats = control(base_url, "stats")
+                runs.append({"engine": engine, "repeat": repeat, **result, **stats})
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(runs)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "runs": runs}, f, indent=2)
@@ -0,0 +1,90 @@
+"""
+Backfill check of the alert / incident store (store.py).
+
+Backfilled reports read their alert and incident windows from the store when
+it is enabled. A window that starts before STORE_RETENTION_DAYS would be
+pruned by the sync that fetched it, so such windows must come from the API.
+This check serves a synthetic tenant older than the retention from an
+in-process mock server and compares, for a backfill date outside retention
+and one inside it, the summaries read with the store against those streamed
+from the API without it.
+
+Usage:
+    python -m bench.store_backfill
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+from unittest import mock
+
+from bench.mock_server import MockConfig, MockServer
+
+# Days before today of the backfilled dates: past and within the default
+# STORE_RETENTION_DAYS (62)
+BACKFILL_AGES = (85, 20)
+MOCK_CONFIG = MockConfig(alerts=20_000, incidents=4_000, days=130, latency=0.0)
+
+
+def comparable(summary: dict) -> dict:
+    """
+    Summary with tuple window keys as strings, dict order dropped and
+    numbers as plain ints.
+    """
+    return json.loads(json.dumps(
+        {str(key): value for key, value in summary.items()}, sort_keys=True, default=int
+    ))
+
+
+def check(base_url: str, store_path: str) -> list:
+    """
+    Returns:
+        list of failure descriptions, empty when the store and the API agree.
+    """
+    # Settings are read at import time
+    os.environ.update(MOOGSOFT_BASE_URL=base_url, MOOGSOFT_API_KEY="bench", MOOGSOFT_STORE_PATH=store_path)
+    import main
+    import store
+    from apis import alerts, incidents
+
+    failures = []
+    for age in BACKFILL_AGES:
+        day = date.today() - timedelta(days=age)
+        times = main.report_times(main.report_at(day, main.BACKFILL_REPORT_TIME))
+        windows = main.report_windows(times)
+
+        stored = (alerts.aggregate_alert_windows(windows), incidents.aggregate_incident_windows(windows))
+        with mock.patch.object(store, "STORE_PATH", ""):
+            streamed = (alerts.aggregate_alert_windows(windows), incidents.aggregate_incident_windows(windows))
+
+        if not streamed[0]["per_manager"]["this_month"] or not streamed[1]["this_month"]["total_count"]:
+            failures.append(f"{day}: the mock API returned no alerts or incidents for the month")
+        if comparable(stored[0]) != comparable(streamed[0]):
+            failures.append(f"{day} ({age} days ago): alert summary with the store differs from the API")
+        if comparable(stored[1]) != comparable(streamed[1]):
+            failures.append(f"{day} ({age} days ago): incident summary with the store differs from the API")
+
+    # The date within retention must actually have been read from the store
+    with store.RecordStore(store_path) as record_store:
+        if record_store.sync_state(alerts.STORE_DATASET) is None:
+            failures.append("the store was never synced")
+    return failures
+
+
+if __name__ == "__main__":
+    server = MockServer(("127.0.0.1", 0), MOCK_CONFIG)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            failures = check(server.url, os.path.join(directory, "store.sqlite"))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+    print("Backfills read from the store match the API, within and past retention")
@@ -0,0 +1,134 @@
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import STORE_OVERLAP_SECONDS, STORE_RETENTION_DAYS
+from store import RecordStore
+
+# Checkpoint days follow the report's time zone
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def day_label(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, IST).strftime("%Y-%m-%d")
+
+
+def day_start(epoch: float) -> float:
+    dt = datetime.fromtimestamp(epoch, IST)
+    return datetime(dt.year, dt.month, dt.day, tzinfo=IST).timestamp()
+
+
+def days_between(start: float, end: float) -> list:
+    """
+    Full IST days inside [start, end).
+
+    Returns:
+        list of (label, day_start_epoch, day_end_epoch), oldest first.
+    """
+    days = []
+    current = day_start(start)
+    if current < start:
+        current = day_start(current + 36 * 60 * 60)
+
+    while True:
+        dt = datetime.fromtimestamp(current, IST) + timedelta(days=1)
+        next_start = datetime(dt.year, dt.month, dt.day, tzinfo=IST).timestamp()
+        if next_start > end:
+            break
+        days.append((day_label(current), current, next_start))
+        current = next_start
+    return days
+
+
+def closed_days(store: RecordStore, dataset: str, start: float, overlap: float = None) -> list:
+    """
+    Days since start whose records can no longer change: they end before
+    the part of the store that the next delta fetch will overwrite.
+    """
+    overlap = STORE_OVERLAP_SECONDS if overlap is None else overlap
+    state = store.sync_state(dataset)
+    if state is None:
+        return []
+    return days_between(start, state[1] - overlap)
+
+
+def load_or_build(store: RecordStore, dataset: str, days: list, build_day) -> list:
+    """
+    Return the checkpoint of every day, building and saving missing ones.
+
+    Args:
+        store: Open RecordStore.
+        dataset: Dataset name.
+        days: Output of closed_days / days_between.
+        build_day: Callable(day_start, day_end) -> JSON serializable partial
+            aggregate computed from the stored records of that day.
+
+    Returns:
+        list of partial aggregates, in day order.
+    """
+    partials = []
+    for label, start, end in days:
+        partial = store.load_checkpoint(dataset, label)
+        if partial is None:
+            partial = build_day(start, end)
+            store.save_checkpoint(dataset, label, partial)
+        partials.append(partial)
+    return partials
+
+
+def prune_checkpoints(store: RecordStore, dataset: str, before: float = None) -> None:
+    if before is None:
+        before = time.time() - STORE_RETENTION_DAYS * 24 * 60 * 60
+    with store.conn:
+        store.conn.execute(
+            "DELETE FROM checkpoints WHERE dataset = ? AND day < ?", (dataset, day_label(before))
+        )
+
+
+def rebuild(dataset: str, days: list, refetch: bool = False) -> None:
+    """
+    Invalidate and rebuild the checkpoints of the given days (YYYY-MM-DD).
+
+    With refetch, the records from the earliest day onwards are pulled from
+    the API again before rebuilding.
+    """
+    from apis import alerts, incidents
+    modules = {"alerts": alerts, "incidents": incidents}
+    module = modules[dataset]
+
+    with RecordStore() as store:
+        bounds = []
+        for label in days:
+            start = datetime.strptime(label, "%Y-%m-%d").replace(tzinfo=IST).timestamp()
+            bounds.append((label, start, start + 24 * 60 * 60))
+
+        removed = store.delete_checkpoints(dataset, days)
+        print(f"Removed {removed} {dataset} checkpoint(s)")
+
+        if refetch:
+            earliest = min(start for _, start, _ in bounds)
+            module.resync_store(store, earliest)
+
+        state = store.sync_state(dataset)
+        for label, start, end in bounds:
+            if state is None or end > state[1] - STORE_OVERLAP_SECONDS:
+                print(f"{dataset} {label}: not closed yet, left to the next run")
+                continue
+            store.save_checkpoint(dataset, label, module.build_checkpoint(store, start, end))
+            print(f"{dataset} {label}: checkpoint rebuilt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage daily alert/incident aggregate checkpoints.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Invalidate and rebuild checkpoints")
+    rebuild_parser.add_argument("--dataset", choices=["alerts", "incidents"], action="append",
+                                help="Dataset to rebuild (default: both)")
+    rebuild_parser.add_argument("days", nargs="+", metavar="YYYY-MM-DD")
+    rebuild_parser.add_argument("--refetch", action="store_true",
+                                help="Pull the records again from the API before rebuilding")
+
+    args = parser.parse_args()
+    for name in args.dataset or ["alerts", "incidents"]:
+        rebuild(name, args.days, refetch=args.refetch)
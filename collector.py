@@ -0,0 +1,197 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import telemetry
+from config import COLLECTOR_MAX_WORKERS
+
+
+class CollectorError(RuntimeError):
+    """
+    Raised when a required section fails and the report cannot be built.
+    """
+
+
+@dataclass
+class Section:
+    """
+    A single report section in the collector graph.
+
+    Attributes:
+        name: Key the section result is stored under.
+        label: Human readable name used in timing / failure messages.
+        fetch: Callable receiving the results dict of finished sections.
+        fallback: Callable returning the value used when fetch fails.
+        depends_on: Names of sections that must finish before this one starts.
+        required: When True, a failure aborts the whole collection.
+        fetch_async: Coroutine function with the same contract as fetch,
+            used by run_sections_async.
+    """
+    name: str
+    label: str
+    fetch: Callable[[dict], object]
+    fallback: Callable[[], object] = dict
+    depends_on: tuple = ()
+    required: bool = False
+    fetch_async: Callable[[dict], Awaitable] = None
+
+
+@dataclass
+class CollectorResult:
+    results: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    failures: dict = field(default_factory=dict)
+
+
+def _validate(sections: list[Section]) -> None:
+    names = [section.name for section in sections]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate section names: {names}")
+
+    known = set(names)
+    for section in sections:
+        missing = [dep for dep in section.depends_on if dep not in known]
+        if missing:
+            raise ValueError(f"Section '{section.name}' depends on unknown sections: {missing}")
+
+    # Kahn's algorithm, only to reject cycles up front
+    remaining = {section.name: set(section.depends_on) for section in sections}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between sections: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _run_section(section: Section, results: dict):
+    t0 = time.perf_counter()
+    try:
+        with telemetry.section(section.name):
+            value = section.fetch(results)
+        error = None
+    except Exception as e:
+        value = None
+        error = e
+    return value, error, time.perf_counter() - t0
+
+
+async def _run_section_async(section: Section, results: dict):
+    t0 = time.perf_counter()
+    try:
+        with telemetry.section(section.name):
+            value = await section.fetch_async(results)
+        error = None
+    except Exception as e:
+        value = None
+        error = e
+    return value, error, time.perf_counter() - t0
+
+
+def _record(collected: CollectorResult, section: Section, value, error, elapsed: float) -> bool:
+    """
+    Store a finished section, substituting its fallback on failure.
+    Returns False when a required section failed.
+    """
+    collected.timings[section.name] = elapsed
+
+    if error is not None:
+        print(f"Failed to fetch {section.label}: {error}")
+        collected.failures[section.name] = error
+        if section.required:
+            return False
+        value = section.fallback()
+
+    collected.results[section.name] = value
+    print(f"Fetch {section.label}: {elapsed:.2f} seconds")
+    return True
+
+
+def run_sections(sections: list[Section], max_workers: int = None) -> CollectorResult:
+    """
+    Run the section graph concurrently, starting each section as soon as
+    all of its dependencies have finished.
+
+    Args:
+        sections: Sections to collect.
+        max_workers: Concurrency limit, defaults to COLLECTOR_MAX_WORKERS.
+
+    Returns:
+        CollectorResult with per-section results (fallbacks on failure),
+        timings in seconds and the exceptions of failed sections.
+
+    Raises:
+        CollectorError: If a section marked as required fails.
+    """
+    _validate(sections)
+    max_workers = max(1, max_workers or COLLECTOR_MAX_WORKERS)
+
+    collected = CollectorResult()
+    pending = {section.name: section for section in sections}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collector") as executor:
+        while pending or running:
+            for name, section in list(pending.items()):
+                if all(dep in collected.results for dep in section.depends_on):
+                    # Dependents only ever see a snapshot of finished sections
+                    future = executor.submit(_run_section, section, dict(collected.results))
+                    running[future] = section
+                    del pending[name]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                section = running.pop(future)
+                value, error, elapsed = future.result()
+                if not _record(collected, section, value, error, elapsed):
+                    for other in running:
+                        other.cancel()
+                    raise CollectorError(f"Required section '{section.name}' failed: {error}") from error
+
+    return collected
+
+
+async def run_sections_async(sections: list[Section]) -> CollectorResult:
+    """
+    Async counterpart of run_sections: every section runs as a task on the
+    current event loop as soon as its dependencies have finished. There is
+    no worker limit here; concurrency is bounded by the HTTP client's
+    in-flight cap instead.
+
+    Raises:
+        CollectorError: If a section marked as required fails.
+    """
+    _validate(sections)
+    missing = [section.name for section in sections if section.fetch_async is None]
+    if missing:
+        raise ValueError(f"Sections without an async fetch: {missing}")
+
+    collected = CollectorResult()
+    pending = {section.name: section for section in sections}
+    running = {}
+
+    try:
+        while pending or running:
+            for name, section in list(pending.items()):
+                if all(dep in collected.results for dep in section.depends_on):
+                    task = asyncio.create_task(_run_section_async(section, dict(collected.results)))
+                    running[task] = section
+                    del pending[name]
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                section = running.pop(task)
+                value, error, elapsed = task.result()
+                if not _record(collected, section, value, error, elapsed):
+                    raise CollectorError(f"Required section '{section.name}' failed: {error}") from error
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return collected
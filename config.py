@@ -1,6 +1,90 @@
 import os
 
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 MOOGSOFT_API_KEY = os.getenv("MOOGSOFT_API_KEY")
+# Point at a local mock server for benchmarks (bench/mock_server.py)
+MOOGSOFT_BASE_URL = os.getenv("MOOGSOFT_BASE_URL", "https://api.moogsoft.ai").rstrip("/")
 GMAIL_USER = os.getenv("GMAIL_USER")
 GMAIL_PASS = os.getenv("GMAIL_PASS")
 RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL")
+
+# Outgoing mail (email_report.Mailer): one connection is reused for every report
+# of a run. SMTP_SECURITY is "ssl", "starttls" or "none" (e.g. a local debug
+# server); 4xx replies and dropped connections are retried SMTP_MAX_RETRIES times.
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_MAX_RETRIES = int(os.getenv("SMTP_MAX_RETRIES", "3"))
+
+# Report profiles (profiles.py): JSON file of tailored reports (recipients,
+# manager filter, sections) built from one data pull; when empty, one report
+# goes to RECIPIENT_EMAIL. PROFILE_MAX_WORKERS profiles render and send at once.
+REPORT_PROFILES_PATH = os.getenv("REPORT_PROFILES_PATH", "")
+PROFILE_MAX_WORKERS = int(os.getenv("PROFILE_MAX_WORKERS", "4"))
+
+# Report size (report_digest.py): repeated list items (workloads, error messages)
+# are counted and only the REPORT_INLINE_LIMIT most frequent are rendered, each
+# cut to REPORT_ITEM_MAX_CHARS; full lists go in a gzip CSV attachment
+REPORT_INLINE_LIMIT = int(os.getenv("REPORT_INLINE_LIMIT", "25"))
+REPORT_ITEM_MAX_CHARS = int(os.getenv("REPORT_ITEM_MAX_CHARS", "300"))
+
+# Maximum number of report sections fetched concurrently by the collector
+COLLECTOR_MAX_WORKERS = int(os.getenv("COLLECTOR_MAX_WORKERS", "6"))
+
+# Shared HTTP client (apis/client.py)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+
+# Per-integration error fetches (apis/inbound_errors.py, apis/outbound_errors.py)
+ERRORS_MAX_WORKERS = int(os.getenv("ERRORS_MAX_WORKERS", "8"))
+ERRORS_REQUEST_DEADLINE = float(os.getenv("ERRORS_REQUEST_DEADLINE", "30"))
+# Outbound error messages kept per webhook, as counted templates (apis/messages.py)
+ERRORS_TOP_MESSAGES = int(os.getenv("ERRORS_TOP_MESSAGES", "10"))
+
+# Audit counts (apis/audits.py): try one unfiltered query grouped by service
+# before falling back to one concurrent request per service. Off by default:
+# it relies on the response's total count, a shape not verified on the real API
+AUDITS_GROUPED_QUERY = os.getenv("AUDITS_GROUPED_QUERY", "false").lower() in ("1", "true", "yes")
+
+# Inbound integrations (apis/inbound_integrations.py): query the type filtered
+# lists only for types missing from the unfiltered list, instead of always
+# querying all of them concurrently with it. Off by default: the API gives no
+# sign that the unfiltered list is complete for a type it includes
+INBOUND_MINIMAL_DISCOVERY = os.getenv("INBOUND_MINIMAL_DISCOVERY", "false").lower() in ("1", "true", "yes")
+
+# Fetch engine used by main.py: "threads" (default) or "async" (requires aiohttp)
+FETCH_ENGINE = os.getenv("FETCH_ENGINE", "threads")
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "16"))
+
+# Incremental alert/incident store (store.py); disabled when MOOGSOFT_STORE_PATH is empty.
+# Opt-in: records are only re-fetched while they are newer than the watermark
+# minus STORE_OVERLAP_SECONDS, so later changes to older records (event counts,
+# closure, auto_close / SNOWInc tags) are not picked up
+STORE_PATH = os.getenv("MOOGSOFT_STORE_PATH", "")
+STORE_OVERLAP_SECONDS = int(os.getenv("STORE_OVERLAP_SECONDS", str(6 * 60 * 60)))
+STORE_RETENTION_DAYS = int(os.getenv("STORE_RETENTION_DAYS", "62"))
+
+# Performance telemetry (telemetry.py); nothing is written when TELEMETRY_PATH is empty
+TELEMETRY_PATH = os.getenv("TELEMETRY_PATH", "")
+TELEMETRY_FORMAT = os.getenv("TELEMETRY_FORMAT", "jsonl")  # "jsonl" or "openmetrics"
+TELEMETRY_IN_REPORT = os.getenv("TELEMETRY_IN_REPORT", "false").lower() in ("1", "true", "yes")
+
+# Report templates (email_report.py). The directory defaults to templates/ next
+# to this file; compiled templates are cached in TEMPLATE_CACHE_DIR, or in
+# Jinja's per-user temp directory when empty. Set it to "off" to disable.
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", os.path.join(_PACKAGE_DIR, "templates"))
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", "")
+
+# JSON decoding of API responses (apis/decoding.py): "auto" picks msgspec, then
+# orjson when installed, else the stdlib; or force "msgspec", "orjson" or "json"
+JSON_DECODER = os.getenv("JSON_DECODER", "auto")
+
+# Response cache for inventory endpoints (apis/response_cache.py); disabled when
+# HTTP_CACHE_DIR is empty. Entries younger than HTTP_CACHE_TTL seconds are used
+# without a request, older ones are revalidated.
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(6 * 60 * 60)))
@@ -1,13 +1,73 @@
-from jinja2 import Environment, FileSystemLoader
+import os
+import threading
+import time
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
 import smtplib
+from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from config import GMAIL_USER, GMAIL_PASS, RECIPIENT_EMAIL
+from apis.client import backoff_delay
+from config import (
+    GMAIL_USER, GMAIL_PASS, RECIPIENT_EMAIL, TEMPLATE_DIR, TEMPLATE_CACHE_DIR,
+    SMTP_HOST, SMTP_PORT, SMTP_SECURITY, SMTP_TIMEOUT, SMTP_MAX_RETRIES
+)
+
+REPORT_TEMPLATE = "health_check.html"
+# Report sections a profile can select (profiles.py), in template order
+REPORT_SECTIONS = (
+    "inbound_errors", "outbound_errors", "catalogs", "maintenance",
+    "audits", "alerts", "incidents"
+)
+
+_environment = None
+_environment_lock = threading.Lock()
+
+
+def create_environment(template_dir: str = TEMPLATE_DIR, cache_dir: str = TEMPLATE_CACHE_DIR) -> Environment:
+    """
+    Build a Jinja environment for the report templates.
+
+    Compiled templates stay in the environment's cache for the life of the
+    process and, unless cache_dir is "off", their bytecode is also written
+    to disk so later processes skip compilation. Values are HTML-escaped.
+    """
+    if cache_dir == "off":
+        bytecode_cache = None
+    elif cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    else:
+        bytecode_cache = FileSystemBytecodeCache()
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        bytecode_cache=bytecode_cache,
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False
+    )
+
+
+def get_environment() -> Environment:
+    """
+    Return the process-wide report environment, creating it on first use.
+    """
+    global _environment
+    if _environment is None:
+        with _environment_lock:
+            if _environment is None:
+                _environment = create_environment()
+    return _environment
+
+
+def load_templates(env: Environment = None) -> None:
+    """
+    Compile the report templates up front, e.g. at startup, so rendering
+    reports later only costs the data.
+    """
+    (env or get_environment()).get_template(REPORT_TEMPLATE)
 
-def generate_html_report(data):
-    # Load the template from the templates folder
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template("health_check.html")  # your template file
+
+def generate_html_report(data, env: Environment = None):
+    template = (env or get_environment()).get_template(REPORT_TEMPLATE)
 
     # Render the HTML with your data dictionary
     html = template.render(
@@ -30,31 +90,145 @@ def generate_html_report(data):
         alerts_by_maintenance=data.get("alerts_by_maintenance", {}),
         audit_summary=data.get("audit_summary", {}),
         alerts_summary=data.get("alerts_summary", {}),
-        incidents_summary=data.get("incidents_summary", {})
+        incidents_summary=data.get("incidents_summary", {}),
+        timings=data.get("timings", []),
+        sections=data.get("sections", REPORT_SECTIONS)
     )
     return html
 
-def send_email(subject, html_body):
-    msg = MIMEMultipart("alternative")
+def build_message(subject: str, html_body: str, recipients: list, attachments: dict = None) -> MIMEMultipart:
+    """
+    Build the report email; attachments maps file names to their bytes.
+    """
+    msg = MIMEMultipart("mixed" if attachments else "alternative")
     msg["Subject"] = subject
     msg["From"] = GMAIL_USER
-    msg["To"] = RECIPIENT_EMAIL
+    msg["To"] = ", ".join(recipients)
 
     # Attach the HTML content as the email body
     part = MIMEText(html_body, "html")
     msg.attach(part)
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(GMAIL_USER, GMAIL_PASS)
-        server.sendmail(GMAIL_USER, RECIPIENT_EMAIL, msg.as_string())
-
-
-
-
-
-
-
-
-
-
-
+    for filename, content in (attachments or {}).items():
+        msg.attach(MIMEApplication(content, Name=filename))
+        msg.get_payload()[-1]["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return msg
+
+
+class Mailer:
+    """
+    One authenticated SMTP connection reused for every message of a run.
+
+    The connection is opened on the first send and kept until close(), so a
+    batch of reports pays for one TLS handshake and login. Sends are
+    serialized on a lock, which lets report threads share the connection.
+    A dropped connection is reopened and the message resent; 4xx replies
+    (throttling, "try again later") are retried with exponential backoff;
+    5xx replies fail the message.
+
+    SMTP_SECURITY selects "ssl" (SMTP_SSL, the Gmail default), "starttls" or
+    "none", the latter for a local debug server. Login happens only when
+    credentials are set and the server offers AUTH.
+    """
+
+    def __init__(self, host: str = None, port: int = None, security: str = None,
+                 max_retries: int = None):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.security = security or SMTP_SECURITY
+        self.max_retries = SMTP_MAX_RETRIES if max_retries is None else max_retries
+        self._server = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._server is None:
+            if self.security == "ssl":
+                server = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT)
+            else:
+                server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+                if self.security == "starttls":
+                    server.starttls()
+            server.ehlo_or_helo_if_needed()
+            if GMAIL_USER and GMAIL_PASS and server.has_extn("auth"):
+                server.login(GMAIL_USER, GMAIL_PASS)
+            self._server = server
+        return self._server
+
+    def _drop(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.close()
+            except OSError:
+                pass
+
+    def send(self, msg: MIMEMultipart, recipients: list) -> None:
+        """
+        Send one message over the shared connection.
+
+        Raises:
+            smtplib.SMTPException: Permanent (5xx) failures, and transient
+                ones still failing after SMTP_MAX_RETRIES retries.
+            OSError: Connection failures after SMTP_MAX_RETRIES retries.
+        """
+        body = msg.as_string()
+        with self._lock:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    refused = self._connect().sendmail(msg["From"], recipients, body)
+                    if refused:
+                        print(f"Recipients refused: {refused}")
+                    return
+                except smtplib.SMTPResponseException as e:
+                    if not 400 <= e.smtp_code < 500 or attempt == self.max_retries:
+                        raise
+                    if e.smtp_code == 421:
+                        # Server is closing the connection
+                        self._drop()
+                    reason = f"SMTP {e.smtp_code}"
+                except smtplib.SMTPRecipientsRefused as e:
+                    codes = [code for code, _ in e.recipients.values()]
+                    if not all(400 <= code < 500 for code in codes) or attempt == self.max_retries:
+                        raise
+                    reason = f"SMTP {codes[0]}"
+                except OSError as e:
+                    if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                        raise
+                    # Dropped connections, resets and timeouts: reconnect
+                    self._drop()
+                    if attempt == self.max_retries:
+                        raise
+                    reason = f"connection error: {e}"
+                delay = backoff_delay(attempt)
+                print(f"Retrying email '{msg['Subject']}' in {delay:.1f}s after {reason}")
+                time.sleep(delay)
+
+    def close(self) -> None:
+        with self._lock:
+            server, self._server = self._server, None
+            if server is not None:
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    server.close()
+
+    def __enter__(self) -> "Mailer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def send_email(subject, html_body, recipients=None, mailer: Mailer = None, attachments: dict = None):
+    """
+    Email an HTML report. Pass a shared Mailer to send a batch of reports
+    over one connection; without one a connection is opened for this message.
+    """
+    recipients = list(recipients or [RECIPIENT_EMAIL])
+    msg = build_message(subject, html_body, recipients, attachments)
+
+    if mailer is not None:
+        mailer.send(msg, recipients)
+        return
+    with Mailer() as mailer:
+        mailer.send(msg, recipients)
@@ -1,148 +1,106 @@
+import argparse
+import asyncio
+import contextlib
+import os
 import time
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from apis import (
     statistics, inbound_integrations, inbound_errors,
     outbound_integrations, outbound_errors, catalogs,
     maintenance, audits, alerts, incidents
 )
-from email_report import generate_html_report, send_email
+from apis import async_client
+from apis.fanout import fan_out
+from collector import Section, CollectorError, run_sections, run_sections_async
+from config import COLLECTOR_MAX_WORKERS, ERRORS_MAX_WORKERS, FETCH_ENGINE, PROFILE_MAX_WORKERS, TELEMETRY_IN_REPORT
+from email_report import REPORT_SECTIONS, Mailer, generate_html_report, load_templates, send_email
+from profiles import ReportProfile, load_profiles, needed_sections, profile_view
+from report_digest import DETAILS_FILENAME, details_attachment, digest_report
+import telemetry
 
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# Time of day backfilled reports are generated for, matching the scheduled run (06:00 UTC)
+BACKFILL_REPORT_TIME = "11:30"
+
 inbound_integrations_list = []
 outbound_integrations_list = []
 
-def main():
-    global inbound_integrations_list, outbound_integrations_list
-
-    overall_start = time.perf_counter()
-    now = datetime.now(IST)
+def report_times(now: datetime) -> dict:
+    """
+    Time bounds of the report generated at `now` (IST): the 24 hours before
+    it, in ms and seconds, and the start of its month.
+    """
     start_dt = now - timedelta(days=1)
-    end_dt = now
-
-    start_ms = int(start_dt.timestamp() * 1000)
-    end_ms = int(end_dt.timestamp() * 1000)
     epoch_now_sec = int(now.timestamp())
-    last_24h_sec = epoch_now_sec - (24 * 60 * 60)
-    month_start_sec = int(datetime(now.year, now.month, 1, tzinfo=IST).timestamp())
-
-    # Timing each block
-    t0 = time.perf_counter()
-    try:
-        stats = statistics.fetch_statistics(start_ms, end_ms)
-    except Exception as e:
-        print(f"Failed to fetch statistics: {e}")
-        return
-    print(f"Fetch statistics: {time.perf_counter() - t0:.2f} seconds")
-
-    t0 = time.perf_counter()
-    try:
-        inbound_data = inbound_integrations.fetch_inbound_integrations()
-        inbound_integrations_count = inbound_data.get("total", 0)
-        inbound_integrations_list = inbound_data.get("integrations", [])
-    except Exception as e:
-        print(f"Failed to fetch inbound integrations: {e}")
-        inbound_integrations_count = 0
-        inbound_integrations_list = []
-    print(f"Fetch inbound integrations: {time.perf_counter() - t0:.2f} seconds")
-
-    t0 = time.perf_counter()
-    try:
-        outbound_data = outbound_integrations.fetch_outbound_integrations()
-        outbound_integrations_count = outbound_data.get("total", 0)
-        outbound_integrations_list = outbound_data.get("integrations", [])
-    except Exception as e:
-        print(f"Failed to fetch outbound integrations: {e}")
-        outbound_integrations_count = 0
-        outbound_integrations_list = []
-    print(f"Fetch outbound integrations: {time.perf_counter() - t0:.2f} seconds")
+    return {
+        "now": now,
+        "start_dt": start_dt,
+        "end_dt": now,
+        "start_ms": int(start_dt.timestamp() * 1000),
+        "end_ms": int(now.timestamp() * 1000),
+        "last_24h_sec": epoch_now_sec - (24 * 60 * 60),
+        "month_start_sec": int(datetime(now.year, now.month, 1, tzinfo=IST).timestamp())
+    }
 
-    t0 = time.perf_counter()
-    try:
-        inbound_error_summary = inbound_errors.fetch_inbound_errors(
-            inbound_integrations_list,
-            end_ms
-        )
-    except Exception as e:
-        print(f"Failed to fetch inbound integration errors: {e}")
-        inbound_error_summary = {"recent_errors": {}, "older_errors": {}}
-    print(f"Fetch inbound errors: {time.perf_counter() - t0:.2f} seconds")
+def empty_maintenance():
+    return {
+        "maintenance_summary": {
+            "active_last_24h": 0,
+            "config_items_in_24h": 0,
+            "total_this_month": 0
+        },
+        "alerts_by_maintenance": {
+            "last_24h": {},
+            "this_week": {},
+            "last_week": {},
+            "this_month": {}
+        }
+    }
 
-    t0 = time.perf_counter()
-    try:
-        outbound_error_summary = outbound_errors.fetch_outbound_errors(
-            outbound_integrations_list,
-            end_ms
-        )
-    except Exception as e:
-        print(f"Failed to fetch outbound integration errors: {e}")
-        outbound_error_summary = {"recent_errors": {}, "older_errors": {}}
-    print(f"Fetch outbound errors: {time.perf_counter() - t0:.2f} seconds")
+def empty_alerts():
+    return {
+        "per_manager": {"this_month": {}, "last_24h": {}},
+        "nagios": {"this_month": {}, "last_24h": {}}
+    }
 
-    t0 = time.perf_counter()
-    catalog_summary = catalogs.fetch_recent_catalog_updates(end_ms)
-    print(f"Fetch catalog updates: {time.perf_counter() - t0:.2f} seconds")
+def empty_incidents():
+    return {
+        "this_month": {},
+        "last_24h": {}
+    }
 
-    t0 = time.perf_counter()
-    try:
-        maintenance_data = maintenance.fetch_maintenance_and_alerts(end_ms)
-    except Exception as e:
-        print(f"Failed to fetch maintenance data: {e}")
-        maintenance_data = {
-            "maintenance_summary": {
-                "active_last_24h": 0,
-                "config_items_in_24h": 0,
-                "total_this_month": 0
-            },
-            "alerts_by_maintenance": {
-                "last_24h": {},
-                "this_week": {},
-                "last_week": {},
-                "this_month": {}
-            }
-        }
-    print(f"Fetch maintenance data: {time.perf_counter() - t0:.2f} seconds")
+def empty_errors():
+    return {"recent_errors": {}, "older_errors": {}}
 
-    t0 = time.perf_counter()
-    try:
-        audit_summary = audits.fetch_audit_counts(start_ms, end_ms)
-    except Exception as e:
-        print(f"Failed to fetch audit summary: {e}")
-        audit_summary = {}
-    print(f"Fetch audit summary: {time.perf_counter() - t0:.2f} seconds")
+def empty_integrations():
+    return {"total": 0, "integrations": []}
 
-    t0 = time.perf_counter()
-    try:
-        alerts_summary = alerts.aggregate_alerts(
-            this_month_epoch=month_start_sec,
-            last_24h_epoch=last_24h_sec
-        )
-    except Exception as e:
-        print(f"Failed to fetch alerts summary: {e}")
-        alerts_summary = {
-            "per_manager": {"this_month": {}, "last_24h": {}},
-            "nagios": {"this_month": {}, "last_24h": {}}
-        }
-    print(f"Fetch alerts summary: {time.perf_counter() - t0:.2f} seconds")
+def build_report_data(results: dict, times: dict) -> dict:
+    """
+    Turn the collected section results of one report into the template data.
+    """
+    global inbound_integrations_list, outbound_integrations_list
 
-    t0 = time.perf_counter()
-    try:
-        incidents_summary = incidents.aggregate_incidents(
-            this_month_epoch=month_start_sec,
-            last_24h_epoch=last_24h_sec
-        )
-    except Exception as e:
-        print(f"Failed to fetch incidents summary: {e}")
-        incidents_summary = {
-            "this_month": {},
-            "last_24h": {}
-        }
-    print(f"Fetch incidents summary: {time.perf_counter() - t0:.2f} seconds")
+    stats = results["statistics"]
+    inbound_data = results["inbound_integrations"]
+    outbound_data = results["outbound_integrations"]
+    inbound_integrations_count = inbound_data.get("total", 0)
+    inbound_integrations_list = inbound_data.get("integrations", [])
+    outbound_integrations_count = outbound_data.get("total", 0)
+    outbound_integrations_list = outbound_data.get("integrations", [])
+    inbound_error_summary = results["inbound_errors"]
+    outbound_error_summary = results["outbound_errors"]
+    catalog_summary = results["catalogs"]
+    maintenance_data = results["maintenance"]
+    audit_summary = results["audits"]
+    alerts_summary = results["alerts"]
+    incidents_summary = results["incidents"]
 
-    data = {
-        "report_date": now.strftime("%B %d, %Y %I:%M %p IST"),
-        "report_start": start_dt.strftime("%B %d, %Y %I:%M %p IST"),
-        "report_end": end_dt.strftime("%B %d, %Y %I:%M %p IST"),
+    return {
+        "report_date": times["now"].strftime("%B %d, %Y %I:%M %p IST"),
+        "report_start": times["start_dt"].strftime("%B %d, %Y %I:%M %p IST"),
+        "report_end": times["end_dt"].strftime("%B %d, %Y %I:%M %p IST"),
         "events_count": stats.get("event_count", 0),
         "alerts_count": stats.get("alert_count", 0),
         "incidents_count": stats.get("incident_count", 0),
@@ -162,20 +120,451 @@ def main():
         "incidents_summary": incidents_summary
     }
 
-    t0 = time.perf_counter()
-    html_report = generate_html_report(data)
-    print(f"Generate HTML report: {time.perf_counter() - t0:.2f} seconds")
+def deliver_report(html_report: str, now: datetime, profile: ReportProfile = None,
+                   send: bool = True, output_dir: str = None, mailer: Mailer = None,
+                   attachments: dict = None) -> None:
+    """
+    Email the rendered report (with attachments, {file name: bytes}) to the
+    profile's recipients and/or write it to output_dir as
+    health_report_<YYYY-MM-DD>[_<profile>].html, each attachment alongside as
+    health_report_<YYYY-MM-DD>[_<profile>]_<file name>.
+    """
+    named = profile is not None and profile.name != "default"
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        suffix = f"_{profile.name}" if named else ""
+        path = os.path.join(output_dir, f"health_report_{now:%Y-%m-%d}{suffix}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html_report)
+        print(f"Report written to {path}")
+        for filename, content in (attachments or {}).items():
+            with open(os.path.join(output_dir, f"health_report_{now:%Y-%m-%d}{suffix}_{filename}"), "wb") as f:
+                f.write(content)
 
+    if not send:
+        return
     try:
         subject_date = now.strftime("%d %B %Y")
         email_subject = f"Moogsoft Daily Health Report – {subject_date}"
-        send_email(email_subject, html_report)
+        if named:
+            email_subject += f" ({profile.name})"
+        with telemetry.section("email"):
+            send_email(email_subject, html_report, recipients=profile.recipients if profile else None,
+                       mailer=mailer, attachments=attachments)
         print("✅ Email sent successfully.")
     except Exception as e:
         print(f"❌ Failed to send email: {e}")
 
-    print(f"Total execution time: {time.perf_counter() - overall_start:.2f} seconds")
+def deliver_profiles(data: dict, now: datetime, profiles: list, send: bool = True, output_dir: str = None,
+                     mailer: Mailer = None) -> None:
+    """
+    Render and deliver one report per profile from the same report data,
+    PROFILE_MAX_WORKERS profiles at a time. Long lists are capped inline and
+    attached in full (report_digest.py). Emails share one SMTP connection:
+    the given mailer's, or one opened for this batch.
+    """
+    def deliver(profile):
+        t0 = time.perf_counter()
+        with telemetry.section("render"):
+            view, details = digest_report(profile_view(data, profile))
+            html_report = generate_html_report(view)
+            attachments = {DETAILS_FILENAME: details_attachment(details)} if details else None
+        print(f"Generate HTML report ({profile.name}): {time.perf_counter() - t0:.2f} seconds")
+        deliver_report(html_report, now, profile, send=send, output_dir=output_dir, mailer=mailer,
+                       attachments=attachments)
+
+    with contextlib.nullcontext(mailer) if mailer is not None else Mailer() as mailer:
+        fan_out(deliver, profiles, PROFILE_MAX_WORKERS)
+
+def skip_unneeded(sections: list, profiles: list) -> tuple:
+    """
+    Drop the report sections no profile includes.
+
+    Returns:
+        (sections to fetch, { skipped section: its fallback value })
+    """
+    needed = needed_sections(profiles)
+    skipped = [section for section in sections if section.name in REPORT_SECTIONS and section.name not in needed]
+    return (
+        [section for section in sections if section not in skipped],
+        {section.name: section.fallback() for section in skipped}
+    )
+
+def main(max_workers: int = None, engine: str = None, send: bool = True, output_dir: str = None):
+    overall_start = time.perf_counter()
+    run_telemetry = telemetry.start_run()
+    # Compile the report template once, before any section is fetched
+    load_templates()
+    profiles = load_profiles()
+    times = report_times(datetime.now(IST))
+    start_ms = times["start_ms"]
+    end_ms = times["end_ms"]
+    last_24h_sec = times["last_24h_sec"]
+    month_start_sec = times["month_start_sec"]
+
+    # Error fetchers wait on the integration lists, everything else runs independently
+    sections = [
+        Section(
+            name="statistics",
+            label="statistics",
+            fetch=lambda r: statistics.fetch_statistics(start_ms, end_ms),
+            fetch_async=lambda r: statistics.fetch_statistics_async(start_ms, end_ms),
+            required=True
+        ),
+        Section(
+            name="inbound_integrations",
+            label="inbound integrations",
+            fetch=lambda r: inbound_integrations.fetch_inbound_integrations(),
+            fetch_async=lambda r: inbound_integrations.fetch_inbound_integrations_async(),
+            fallback=empty_integrations
+        ),
+        Section(
+            name="outbound_integrations",
+            label="outbound integrations",
+            fetch=lambda r: outbound_integrations.fetch_outbound_integrations(),
+            fetch_async=lambda r: outbound_integrations.fetch_outbound_integrations_async(),
+            fallback=empty_integrations
+        ),
+        Section(
+            name="inbound_errors",
+            label="inbound errors",
+            fetch=lambda r: inbound_errors.fetch_inbound_errors(
+                r["inbound_integrations"].get("integrations", []),
+                end_ms
+            ),
+            fetch_async=lambda r: inbound_errors.fetch_inbound_errors_async(
+                r["inbound_integrations"].get("integrations", []),
+                end_ms
+            ),
+            fallback=empty_errors,
+            depends_on=("inbound_integrations",)
+        ),
+        Section(
+            name="outbound_errors",
+            label="outbound errors",
+            fetch=lambda r: outbound_errors.fetch_outbound_errors(
+                r["outbound_integrations"].get("integrations", []),
+                end_ms
+            ),
+            fetch_async=lambda r: outbound_errors.fetch_outbound_errors_async(
+                r["outbound_integrations"].get("integrations", []),
+                end_ms
+            ),
+            fallback=empty_errors,
+            depends_on=("outbound_integrations",)
+        ),
+        Section(
+            name="catalogs",
+            label="catalog updates",
+            fetch=lambda r: catalogs.fetch_recent_catalog_updates(end_ms),
+            fetch_async=lambda r: catalogs.fetch_recent_catalog_updates_async(end_ms),
+            fallback=lambda: {"recent_catalogs": [], "sync_status": "Failed"}
+        ),
+        Section(
+            name="maintenance",
+            label="maintenance data",
+            fetch=lambda r: maintenance.fetch_maintenance_and_alerts(end_ms),
+            fetch_async=lambda r: maintenance.fetch_maintenance_and_alerts_async(end_ms),
+            fallback=empty_maintenance
+        ),
+        Section(
+            name="audits",
+            label="audit summary",
+            fetch=lambda r: audits.fetch_audit_counts(start_ms, end_ms),
+            fetch_async=lambda r: audits.fetch_audit_counts_async(start_ms, end_ms),
+            fallback=lambda: dict.fromkeys(audits.AUDIT_SERVICES)
+        ),
+        Section(
+            name="alerts",
+            label="alerts summary",
+            fetch=lambda r: alerts.aggregate_alerts(
+                this_month_epoch=month_start_sec,
+                last_24h_epoch=last_24h_sec
+            ),
+            fetch_async=lambda r: alerts.aggregate_alerts_async(
+                this_month_epoch=month_start_sec,
+                last_24h_epoch=last_24h_sec
+            ),
+            fallback=empty_alerts
+        ),
+        Section(
+            name="incidents",
+            label="incidents summary",
+            fetch=lambda r: incidents.aggregate_incidents(
+                this_month_epoch=month_start_sec,
+                last_24h_epoch=last_24h_sec
+            ),
+            fetch_async=lambda r: incidents.aggregate_incidents_async(
+                this_month_epoch=month_start_sec,
+                last_24h_epoch=last_24h_sec
+            ),
+            fallback=empty_incidents
+        ),
+    ]
+
+    sections, skipped = skip_unneeded(sections, profiles)
+
+    engine = engine or FETCH_ENGINE
+    try:
+        if engine == "async":
+            collected = asyncio.run(collect_async(sections))
+        else:
+            collected = run_sections(sections, max_workers=max_workers)
+    except CollectorError:
+        return
+
+    data = build_report_data({**skipped, **collected.results}, times)
+
+    if TELEMETRY_IN_REPORT:
+        data["timings"] = run_telemetry.summary()
+
+    deliver_profiles(data, times["now"], profiles, send=send, output_dir=output_dir)
+
+    total = time.perf_counter() - overall_start
+    run_telemetry.finish_section("total", total)
+    telemetry_path = run_telemetry.write()
+    if telemetry_path:
+        print(f"Telemetry written to {telemetry_path}")
+
+    print(f"Total execution time: {total:.2f} seconds")
+
+
+def report_at(day: date, at: str) -> datetime:
+    """
+    The IST time `at` (HH:MM) on day, when its scheduled report would run.
+    """
+    hour, minute = (int(part) for part in at.split(":"))
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=IST)
+
+def report_windows(times: dict) -> dict:
+    """
+    The alert / incident windows of one report (report_times) as
+    { window_name: (start, end) } epoch seconds.
+    """
+    end_sec = times["end_ms"] / 1000
+    return {
+        "this_month": (times["month_start_sec"], end_sec),
+        "last_24h": (times["last_24h_sec"], end_sec)
+    }
+
+def main_backfill(report_dates: list, at: str = BACKFILL_REPORT_TIME, max_workers: int = None,
+                  send: bool = False, output_dir: str = None):
+    """
+    Generate the reports of several past dates from one data pull.
+
+    Each date's report is the one the scheduled run would have produced at
+    `at` (HH:MM IST) that day. Alerts, incidents and maintenance alerts are
+    fetched once, from the earliest month start, and reduced into every
+    report's windows in the same pass; integration, error and catalog lists
+    are fetched once and summarized per report. Only the statistics and
+    audit counts, which the API aggregates per time range, take one request
+    per date. Sections run on the threads engine.
+    """
+    overall_start = time.perf_counter()
+    run_telemetry = telemetry.start_run()
+    load_templates()
+    profiles = load_profiles()
+    reports = [report_times(report_at(day, at)) for day in sorted(set(report_dates))]
+    ends = [times["end_ms"] for times in reports]
+
+    def per_report(fetch):
+        """
+        One result per report, fetched concurrently: { end_ms: fetch(times) }.
+        At most COLLECTOR_MAX_WORKERS reports are fetched at a time, as each
+        may fan out further (audit counts).
+        """
+        return dict(zip(ends, fan_out(fetch, reports, COLLECTOR_MAX_WORKERS)))
+
+    def each(value):
+        return lambda: {end_ms: value() for end_ms in ends}
+
+    def fetch_errors(module, integrations):
+        def summarize(integration):
+            # Fold the records into every report's summary in the worker, so
+            # only one integration's records per worker are held at a time
+            records = module.fetch_integration_errors(integration)
+            if records is None:
+                return None
+            return {end_ms: module.summarize_integration(records, end_ms) for end_ms in ends}
+
+        summaries = fan_out(summarize, integrations, ERRORS_MAX_WORKERS)
+        return {
+            end_ms: module.merge_summaries(integrations, [summary and summary[end_ms] for summary in summaries])
+            for end_ms in ends
+        }
+
+    def fetch_catalogs():
+        data = catalogs.fetch_catalogs()
+        return {
+            end_ms: catalogs.summarize_catalogs(data, end_ms, 5) if data is not None
+            else {"recent_catalogs": [], "sync_status": "Failed"}
+            for end_ms in ends
+        }
+
+    windows = {
+        (times["end_ms"], name): window for times in reports for name, window in report_windows(times).items()
+    }
+
+    def fetch_alerts():
+        result = alerts.aggregate_alert_windows(windows)
+        return {
+            end_ms: {key: {name: result[key][(end_ms, name)] for name in ("this_month", "last_24h")}
+                     for key in ("per_manager", "nagios")}
+            for end_ms in ends
+        }
+
+    def fetch_incidents():
+        result = incidents.aggregate_incident_windows(windows)
+        return {end_ms: {name: result[(end_ms, name)] for name in ("this_month", "last_24h")} for end_ms in ends}
+
+    sections = [
+        Section(
+            name="statistics",
+            label="statistics",
+            fetch=lambda r: per_report(lambda times: statistics.fetch_statistics(times["start_ms"], times["end_ms"])),
+            required=True
+        ),
+        Section(
+            name="inbound_integrations",
+            label="inbound integrations",
+            fetch=lambda r: inbound_integrations.fetch_inbound_integrations(),
+            fallback=empty_integrations
+        ),
+        Section(
+            name="outbound_integrations",
+            label="outbound integrations",
+            fetch=lambda r: outbound_integrations.fetch_outbound_integrations(),
+            fallback=empty_integrations
+        ),
+        Section(
+            name="inbound_errors",
+            label="inbound errors",
+            fetch=lambda r: fetch_errors(inbound_errors, r["inbound_integrations"].get("integrations", [])),
+            fallback=each(empty_errors),
+            depends_on=("inbound_integrations",)
+        ),
+        Section(
+            name="outbound_errors",
+            label="outbound errors",
+            fetch=lambda r: fetch_errors(outbound_errors, r["outbound_integrations"].get("integrations", [])),
+            fallback=each(empty_errors),
+            depends_on=("outbound_integrations",)
+        ),
+        Section(
+            name="catalogs",
+            label="catalog updates",
+            fetch=lambda r: fetch_catalogs(),
+            fallback=each(lambda: {"recent_catalogs": [], "sync_status": "Failed"})
+        ),
+        Section(
+            name="maintenance",
+            label="maintenance data",
+            fetch=lambda r: maintenance.fetch_maintenance_for_reports(ends),
+            fallback=each(empty_maintenance)
+        ),
+        Section(
+            name="audits",
+            label="audit summary",
+            fetch=lambda r: per_report(lambda times: audits.fetch_audit_counts(times["start_ms"], times["end_ms"])),
+            fallback=each(lambda: dict.fromkeys(audits.AUDIT_SERVICES))
+        ),
+        Section(
+            name="alerts",
+            label="alerts summary",
+            fetch=lambda r: fetch_alerts(),
+            fallback=each(empty_alerts)
+        ),
+        Section(
+            name="incidents",
+            label="incidents summary",
+            fetch=lambda r: fetch_incidents(),
+            fallback=each(empty_incidents)
+        ),
+    ]
+    shared = ("inbound_integrations", "outbound_integrations")
+    sections, skipped = skip_unneeded(sections, profiles)
+
+    try:
+        collected = run_sections(sections, max_workers=max_workers)
+    except CollectorError:
+        return
+
+    with Mailer() as mailer:
+        for times in reports:
+            results = {
+                name: value if name in shared else value[times["end_ms"]]
+                for name, value in {**skipped, **collected.results}.items()
+            }
+            deliver_profiles(build_report_data(results, times), times["now"], profiles,
+                             send=send, output_dir=output_dir, mailer=mailer)
+
+    total = time.perf_counter() - overall_start
+    run_telemetry.finish_section("total", total)
+    telemetry_path = run_telemetry.write()
+    if telemetry_path:
+        print(f"Telemetry written to {telemetry_path}")
+
+    print(f"Backfilled {len(reports)} reports in {total:.2f} seconds")
+
+
+async def collect_async(sections):
+    try:
+        return await run_sections_async(sections)
+    finally:
+        await async_client.close_session()
+
+
+def report_dates(args: argparse.Namespace, parser: argparse.ArgumentParser) -> list:
+    """
+    Dates selected with --date / --from / --to, or an empty list for a live run.
+    Rejects report times (date at --at) in the future and --engine async,
+    as backfills run on the threads engine.
+    """
+    dates = list(args.date or [])
+    if args.date_from or args.date_to:
+        if not (args.date_from and args.date_to) or args.date_from > args.date_to:
+            parser.error("--from and --to must both be given, with --from <= --to")
+        day = args.date_from
+        while day <= args.date_to:
+            dates.append(day)
+            day += timedelta(days=1)
+    if not dates:
+        return dates
+
+    if args.engine == "async":
+        parser.error("--engine async is not supported for backfills, which run on the threads engine")
+    try:
+        latest = report_at(max(dates), args.at)
+    except ValueError:
+        parser.error(f"--at must be HH:MM, got '{args.at}'")
+    if latest > datetime.now(IST):
+        parser.error(f"Cannot build reports for a future time ({latest:%Y-%m-%d %H:%M} IST)")
+    return dates
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build and email the Moogsoft daily health report.")
+    parser.add_argument("--engine", choices=["threads", "async"], default=None,
+                        help=f"Fetch engine (default: FETCH_ENGINE, currently '{FETCH_ENGINE}')")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent sections for the threads engine (default: COLLECTOR_MAX_WORKERS)")
+    parser.add_argument("--date", type=date.fromisoformat, action="append", metavar="YYYY-MM-DD",
+                        help="Backfill the report of this date (repeatable)")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Backfill every date from this one ...")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="... up to and including this one")
+    parser.add_argument("--at", default=BACKFILL_REPORT_TIME, metavar="HH:MM",
+                        help=f"IST time of day backfilled reports are generated for (default: {BACKFILL_REPORT_TIME})")
+    parser.add_argument("--output-dir", metavar="DIR", help="Also write each report to DIR/health_report_<date>.html")
+    parser.add_argument("--email", action=argparse.BooleanOptionalAction, default=None,
+                        help="Email the report(s) (default: yes for the live report, no for backfills)")
+    args = parser.parse_args()
+
+    dates = report_dates(args, parser)
+    if dates:
+        main_backfill(dates, at=args.at, max_workers=args.workers,
+                      send=bool(args.email), output_dir=args.output_dir)
+    else:
+        main(max_workers=args.workers, engine=args.engine,
+             send=args.email is not False, output_dir=args.output_dir)
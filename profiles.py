@@ -0,0 +1,139 @@
+import json
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+from apis.incidents import COUNTER_RULES
+from config import RECIPIENT_EMAIL, REPORT_PROFILES_PATH
+from email_report import REPORT_SECTIONS
+
+
+@dataclass(frozen=True)
+class ReportProfile:
+    """
+    One tailored copy of the report.
+
+    Attributes:
+        name: Profile name, added to the subject and file name unless "default".
+        recipients: Addresses the report is emailed to.
+        managers: Manager names or fnmatch patterns ("Splunk*") the alert,
+            incident and maintenance breakdowns are limited to; None keeps all.
+            The rest of the report stays tenant wide: the event / alert /
+            incident statistics, integration counts, inbound and outbound
+            integration errors, catalogs, audits and the blank cmdb_ci
+            breakdown of incidents.
+        sections: REPORT_SECTIONS entries to include; None includes all.
+    """
+    name: str
+    recipients: tuple
+    managers: tuple | None = None
+    sections: tuple | None = None
+
+    def keeps(self, manager: str) -> bool:
+        return self.managers is None or any(fnmatchcase(manager, pattern) for pattern in self.managers)
+
+
+def split_recipients(value: str | None) -> tuple:
+    return tuple(address.strip() for address in (value or "").split(",") if address.strip())
+
+
+def load_profiles(path: str = None) -> list:
+    """
+    Read the report profiles from a JSON file: a list of objects with
+    "name", "recipients" and optionally "managers" and "sections". Without a
+    file there is one "default" profile mailing RECIPIENT_EMAIL (comma
+    separated addresses allowed) the whole report.
+
+    Raises:
+        ValueError: For a profile without recipients or with unknown sections.
+    """
+    path = path or REPORT_PROFILES_PATH
+    if not path:
+        return [ReportProfile(name="default", recipients=split_recipients(RECIPIENT_EMAIL))]
+
+    with open(path) as f:
+        entries = json.load(f)
+
+    profiles = []
+    for entry in entries:
+        recipients = entry.get("recipients")
+        if isinstance(recipients, str):
+            recipients = split_recipients(recipients)
+        if not recipients:
+            raise ValueError(f"Report profile '{entry.get('name')}' has no recipients")
+        sections = entry.get("sections")
+        unknown = set(sections or ()) - set(REPORT_SECTIONS)
+        if unknown:
+            raise ValueError(f"Report profile '{entry.get('name')}' has unknown sections {sorted(unknown)}, "
+                             f"expected some of {REPORT_SECTIONS}")
+        managers = entry.get("managers")
+        profiles.append(ReportProfile(
+            name=entry["name"],
+            recipients=tuple(recipients),
+            managers=tuple(managers) if managers is not None else None,
+            sections=tuple(sections) if sections is not None else None
+        ))
+    return profiles
+
+
+def needed_sections(profiles: list) -> set:
+    """
+    REPORT_SECTIONS at least one profile includes; the others need not be fetched.
+    """
+    needed = set()
+    for profile in profiles:
+        needed.update(profile.sections or REPORT_SECTIONS)
+    return needed
+
+
+def _keep_managers(counts: dict | None, profile: ReportProfile) -> dict | None:
+    if counts is None:
+        return None
+    return {manager: value for manager, value in counts.items() if profile.keeps(manager)}
+
+
+def incident_view(summary: dict, profile: ReportProfile) -> dict:
+    """
+    An incident window summary limited to the profile's managers. Totals are
+    re-summed from the kept managers; the Dynatrace / Splunk workload lists
+    are kept only with a matching manager. The blank cmdb_ci breakdown is not
+    kept per manager and stays tenant wide.
+    """
+    if not summary:
+        return summary
+    view = dict(summary, per_manager=_keep_managers(summary.get("per_manager", {}), profile))
+    for counter in COUNTER_RULES:
+        view[counter] = sum(counts.get(counter, 0) for counts in view["per_manager"].values())
+    if not profile.keeps("Dynatrace"):
+        view["undiscovered_workloads"] = []
+    if not any(profile.keeps(manager) for manager in summary.get("per_manager", {}) if "Splunk" in manager):
+        view["splunk_workloads"] = []
+    return view
+
+
+def profile_view(data: dict, profile: ReportProfile) -> dict:
+    """
+    The template data of one profile, sliced from the full report data
+    without copying the parts it does not change.
+    """
+    view = dict(data, sections=profile.sections or REPORT_SECTIONS)
+    if profile.managers is None:
+        return view
+
+    alerts_summary = data.get("alerts_summary", {})
+    nagios = alerts_summary.get("nagios", {})
+    view["alerts_summary"] = {
+        "per_manager": {
+            window: _keep_managers(counts, profile)
+            for window, counts in alerts_summary.get("per_manager", {}).items()
+        },
+        "nagios": nagios if profile.keeps("Nagios") else {window: {} for window in nagios}
+    }
+    view["incidents_summary"] = {
+        window: incident_view(summary, profile)
+        for window, summary in data.get("incidents_summary", {}).items()
+    }
+    view["alerts_by_maintenance"] = {
+        period: _keep_managers(counts, profile)
+        for period, counts in data.get("alerts_by_maintenance", {}).items()
+    }
+    return view
@@ -0,0 +1,158 @@
+import csv
+import gzip
+import io
+from collections import Counter
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from config import REPORT_INLINE_LIMIT, REPORT_ITEM_MAX_CHARS
+
+DETAILS_FILENAME = "report_details.csv.gz"
+DETAILS_COLUMNS = ("list", "scope", "item", "count", "first_seen", "last_seen")
+
+
+class Digest(NamedTuple):
+    """
+    A report list deduplicated, counted and capped for inline rendering.
+
+    Attributes:
+        top: (item, count) pairs, most frequent first, at most the inline limit;
+            items longer than REPORT_ITEM_MAX_CHARS are shortened.
+        distinct: Number of distinct items.
+        total: Number of items, duplicates included.
+        complete: False when items were left out or shortened, i.e. the full
+            list is only in the details attachment.
+        attached: Number of items in the details attachment when it holds
+            only the most frequent ones (outbound message templates beyond
+            ERRORS_TOP_MESSAGES are not kept); None when it holds them all.
+    """
+    top: list
+    distinct: int
+    total: int
+    complete: bool
+    attached: int = None
+
+    @property
+    def hidden(self) -> int:
+        return self.distinct - len(self.top)
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+
+def shorten(item, max_chars: int = REPORT_ITEM_MAX_CHARS) -> str:
+    item = str(item)
+    return item if len(item) <= max_chars else item[:max_chars - 1] + "…"
+
+
+def hashable(item):
+    """
+    A report list item usable as a Counter key: lists and tuples (e.g.
+    list-valued tags) joined like incident managers, other unhashable
+    values as their str().
+    """
+    if isinstance(item, (list, tuple)):
+        return ", ".join(map(str, item))
+    try:
+        hash(item)
+    except TypeError:
+        return str(item)
+    return item
+
+
+def digest(counts: Counter, limit: int = REPORT_INLINE_LIMIT, distinct: int = None, total: int = None) -> Digest:
+    """
+    Cap counted items to the limit most frequent ones (ties keep first-seen order).
+    distinct and total default to those of counts; pass them when counts is
+    itself already a top-K of a larger list.
+    """
+    top = counts.most_common(limit)
+    distinct = len(counts) if distinct is None else distinct
+    return Digest(
+        top=[(shorten(item), count) for item, count in top],
+        distinct=distinct,
+        total=sum(counts.values()) if total is None else total,
+        complete=len(top) == distinct and all(len(str(item)) <= REPORT_ITEM_MAX_CHARS for item, _ in top),
+        attached=len(counts) if len(counts) < distinct else None
+    )
+
+
+def iso_time(epoch_ms: int | None) -> str:
+    if epoch_ms is None:
+        return ""
+    return datetime.fromtimestamp(epoch_ms / 1000, timezone.utc).isoformat(timespec="seconds")
+
+
+def digest_report(data: dict, limit: int = None) -> tuple:
+    """
+    Bound the size of the rendered report: the lists that grow with the data
+    (inbound error reasons, outbound error message templates, undiscovered and
+    Splunk workloads, blank cmdb_ci source tags) become Digests of at most
+    limit (REPORT_INLINE_LIMIT) counted items. The report data is not
+    modified, as profiles share it.
+
+    Returns:
+        (view, details): The template data with Digests in place of those
+        lists, and the full lists as DETAILS_COLUMNS rows for the details
+        attachment (outbound messages only with the ERRORS_TOP_MESSAGES
+        templates kept); details is empty when every Digest is complete.
+    """
+    limit = REPORT_INLINE_LIMIT if limit is None else limit
+    rows = []
+    digests = []
+
+    def capped(name, scope, values):
+        counts = Counter(map(hashable, values))
+        rows.extend((name, scope, item, count, "", "") for item, count in counts.items())
+        digests.append(digest(counts, limit))
+        return digests[-1]
+
+    def capped_templates(scope, errors):
+        # Already counted per template by apis.messages.MessageTemplates
+        messages = errors.get("messages", [])
+        rows.extend(
+            ("outbound_error_messages", scope, message["template"], message["count"],
+             iso_time(message["first_seen"]), iso_time(message["last_seen"]))
+            for message in messages
+        )
+        counts = Counter({message["template"]: message["count"] for message in messages})
+        digests.append(digest(counts, limit, distinct=errors.get("message_templates"), total=errors.get("count")))
+        return digests[-1]
+
+    view = dict(data)
+    view["recent_inbound_errors"] = {
+        manager: dict(errors, reasons=capped("inbound_error_reasons", manager, errors.get("reasons", [])))
+        for manager, errors in data.get("recent_inbound_errors", {}).items()
+    }
+    view["recent_outbound_errors"] = {
+        name: dict(errors, messages=capped_templates(name, errors))
+        for name, errors in data.get("recent_outbound_errors", {}).items()
+    }
+
+    incidents_summary = {}
+    for window, summary in data.get("incidents_summary", {}).items():
+        if summary:
+            blank = summary.get("cmdb_ci_blank_workload_blank", {})
+            summary = dict(
+                summary,
+                undiscovered_workloads=capped("undiscovered_workloads", window, summary.get("undiscovered_workloads", [])),
+                splunk_workloads=capped("splunk_workloads", window, summary.get("splunk_workloads", [])),
+                cmdb_ci_blank_workload_blank=dict(
+                    blank, source_tags=capped("blank_cmdb_ci_source_tags", window, blank.get("source_tags", []))
+                )
+            )
+        incidents_summary[window] = summary
+    view["incidents_summary"] = incidents_summary
+
+    return view, [] if all(d.complete for d in digests) else rows
+
+
+def details_attachment(rows: list) -> bytes:
+    """
+    The details rows as a gzip-compressed CSV.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(DETAILS_COLUMNS)
+    writer.writerows(rows)
+    return gzip.compress(buffer.getvalue().encode("utf-8"), mtime=0)
@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from config import STORE_PATH, STORE_OVERLAP_SECONDS, STORE_RETENTION_DAYS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    dataset TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (dataset, record_id)
+);
+CREATE INDEX IF NOT EXISTS records_dataset_ts ON records (dataset, ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    dataset TEXT PRIMARY KEY,
+    covered_from REAL NOT NULL,
+    watermark REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    dataset TEXT NOT NULL,
+    day TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (dataset, day)
+);
+"""
+
+
+def store_enabled() -> bool:
+    return bool(STORE_PATH)
+
+
+def retention_start() -> float:
+    """
+    Epoch seconds before which stored records are pruned (STORE_RETENTION_DAYS).
+    """
+    return time.time() - STORE_RETENTION_DAYS * 24 * 60 * 60
+
+
+def store_covers(start: float) -> bool:
+    """
+    Whether the store should serve records from start on: it is enabled and
+    start is within retention. Older windows (e.g. backfills) are read from
+    the API instead of filling the store with records the next sync prunes.
+    """
+    return store_enabled() and start >= retention_start()
+
+
+class RecordStore:
+    """
+    Local SQLite copy of fetched alert / incident records.
+
+    Each dataset keeps its records keyed by id, plus the time range it has
+    already synced: covered_from (earliest fetch start) and a high-water mark
+    (newest record time seen). Only records newer than the watermark minus an
+    overlap need to be fetched again.
+
+    The watermark follows creation time (first_event_time / created_at), as
+    that is what the searches filter on: once a record is older than the
+    overlap it is frozen as stored, and later changes to it (event counts,
+    closure, tags set days later) are not seen. Hence the store is opt-in.
+
+    Open one store per thread; SQLite handles the cross-connection locking.
+    A store may be handed to worker threads (sync_pages_async) as long as
+    its calls do not overlap.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sync_state(self, dataset: str) -> tuple | None:
+        """
+        Returns:
+            (covered_from, watermark) in epoch seconds, or None if never synced.
+        """
+        return self.conn.execute(
+            "SELECT covered_from, watermark FROM sync_state WHERE dataset = ?", (dataset,)
+        ).fetchone()
+
+    def delta_start(self, dataset: str, fetch_start: float, overlap: float = None) -> float:
+        """
+        Earliest record time that still has to be fetched from the API for
+        the store to cover [fetch_start, now].
+        """
+        overlap = STORE_OVERLAP_SECONDS if overlap is None else overlap
+        state = self.sync_state(dataset)
+        if state is None:
+            return fetch_start
+
+        covered_from, watermark = state
+        if covered_from > fetch_start:
+            # The store starts too late for this window, pull everything
+            return fetch_start
+        return max(fetch_start, watermark - overlap)
+
+    def save_page(self, dataset: str, page: list, id_key: str, time_of, default_time: float) -> float | None:
+        """
+        Upsert one page of records.
+
+        Args:
+            dataset: Dataset name, e.g. "alerts".
+            page: Records as returned by the API.
+            id_key: Record field holding the unique id.
+            time_of: Callable returning a record's epoch seconds (or None).
+            default_time: Time stored for records without one.
+
+        Returns:
+            The newest record time in the page, or None if no record had one.
+        """
+        rows = []
+        newest = None
+        for record in page:
+            ts = time_of(record)
+            if ts is None:
+                ts = default_time
+            else:
+                newest = ts if newest is None else max(newest, ts)
+
+            payload = json.dumps(record, separators=(",", ":"), sort_keys=True)
+            record_id = record.get(id_key)
+            if record_id is None:
+                record_id = hashlib.sha1(payload.encode()).hexdigest()
+            rows.append((dataset, str(record_id), ts, payload))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO records (dataset, record_id, ts, payload) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return newest
+
+    def mark_synced(self, dataset: str, delta_start: float, newest: float | None) -> None:
+        """
+        Record that [delta_start, newest] has been fetched.
+        """
+        state = self.sync_state(dataset)
+        if state is None:
+            covered_from, watermark = delta_start, delta_start
+        else:
+            covered_from, watermark = min(state[0], delta_start), state[1]
+        if newest is not None:
+            watermark = max(watermark, newest)
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (dataset, covered_from, watermark) VALUES (?, ?, ?)",
+                (dataset, covered_from, watermark)
+            )
+
+    def iter_records(self, dataset: str, since: float, until: float = None):
+        """
+        Yield stored records with since <= time (< until), oldest first.
+        """
+        query = "SELECT payload FROM records WHERE dataset = ? AND ts >= ?"
+        params = [dataset, since]
+        if until is not None:
+            query += " AND ts < ?"
+            params.append(until)
+        query += " ORDER BY ts"
+
+        for (payload,) in self.conn.execute(query, params):
+            yield json.loads(payload)
+
+    def load_checkpoint(self, dataset: str, day: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT payload FROM checkpoints WHERE dataset = ? AND day = ?", (dataset, day)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_checkpoint(self, dataset: str, day: str, partial: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (dataset, day, payload) VALUES (?, ?, ?)",
+                (dataset, day, json.dumps(partial, separators=(",", ":")))
+            )
+
+    def delete_checkpoints(self, dataset: str, days: list = None) -> int:
+        """
+        Invalidate the checkpoints of the given days (all days if None).
+        Returns the number of checkpoints removed.
+        """
+        with self.conn:
+            if days is None:
+                cursor = self.conn.execute("DELETE FROM checkpoints WHERE dataset = ?", (dataset,))
+            else:
+                cursor = self.conn.executemany(
+                    "DELETE FROM checkpoints WHERE dataset = ? AND day = ?",
+                    [(dataset, day) for day in days]
+                )
+        return cursor.rowcount
+
+    def prune(self, dataset: str, before: float = None) -> None:
+        """
+        Drop records older than `before` (default: STORE_RETENTION_DAYS ago).
+        """
+        if before is None:
+            before = retention_start()
+        with self.conn:
+            self.conn.execute("DELETE FROM records WHERE dataset = ? AND ts < ?", (dataset, before))
+            self.conn.execute(
+                "UPDATE sync_state SET covered_from = MAX(covered_from, ?) WHERE dataset = ?",
+                (before, dataset)
+            )
+
+
+def sync_pages(store: RecordStore, dataset: str, pages, id_key: str, time_of, delta_start: float) -> None:
+    """
+    Save every page of a delta fetch (fetched from delta_start) and advance
+    the dataset's watermark. The watermark only moves once all pages were
+    stored, so a failed fetch is simply retried from the old watermark.
+    Records past retention are pruned, but never the ones just fetched.
+    """
+    newest = None
+    for page in pages:
+        newest = _newest(newest, store.save_page(dataset, page, id_key, time_of, delta_start))
+    store.mark_synced(dataset, delta_start, newest)
+    store.prune(dataset, min(retention_start(), delta_start))
+
+
+async def sync_pages_async(store: RecordStore, dataset: str, pages, id_key: str, time_of, delta_start: float) -> None:
+    """
+    Async variant of sync_pages for an async iterator of pages. The SQLite
+    writes run on a worker thread, one at a time, so they do not block the
+    event loop and the other requests in flight.
+    """
+    newest = None
+    async for page in pages:
+        newest = _newest(newest, await asyncio.to_thread(store.save_page, dataset, page, id_key, time_of, delta_start))
+    await asyncio.to_thread(store.mark_synced, dataset, delta_start, newest)
+    await asyncio.to_thread(store.prune, dataset, min(retention_start(), delta_start))
+
+
+def _newest(current: float | None, candidate: float | None) -> float | None:
+    if candidate is None:
+        return current
+    return candidate if current is None else max(current, candidate)
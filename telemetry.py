@@ -0,0 +1,203 @@
+import contextvars
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from config import TELEMETRY_PATH, TELEMETRY_FORMAT
+
+# Report section the current thread / task is working for. Collector
+# sections set it; fan_out and asyncio tasks carry it into their workers.
+current_section = contextvars.ContextVar("current_section", default=None)
+
+_COUNTERS = (
+    "requests", "bytes", "pages", "rows", "retries",
+    # apis/response_cache.py outcomes
+    "cache_fresh", "cache_not_modified", "cache_unchanged", "cache_miss"
+)
+
+
+class RunTelemetry:
+    """
+    Performance measurements of one report run.
+
+    Sections record wall time, the counters in _COUNTERS and the process
+    peak RSS when they finished. Every HTTP call is also kept individually
+    and attributed to the section it was made for.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.lock = threading.Lock()
+        self.sections = {}
+        self.calls = []
+
+    def _section(self, name: str) -> dict:
+        return self.sections.setdefault(name, {
+            "wall_seconds": 0.0, "failed": False, "peak_rss_mb": 0.0,
+            **dict.fromkeys(_COUNTERS, 0)
+        })
+
+    def add(self, counter: str, amount: int = 1, section: str = None) -> None:
+        section = section or current_section.get() or "other"
+        with self.lock:
+            self._section(section)[counter] += amount
+
+    def finish_section(self, name: str, elapsed: float, failed: bool = False) -> None:
+        with self.lock:
+            stats = self._section(name)
+            stats["wall_seconds"] += elapsed
+            stats["failed"] = stats["failed"] or failed
+            stats["peak_rss_mb"] = peak_rss_mb()
+
+    def record_call(self, method: str, url: str, endpoint: str | None, status: int | None,
+                    elapsed: float, size: int, retries: int) -> None:
+        section = current_section.get() or "other"
+        parts = urlsplit(url)
+        call = {
+            "section": section,
+            "endpoint": endpoint or "other",
+            "method": method,
+            # Query strings carry ids and timestamps; keep the path only
+            "path": parts.path,
+            "status": status,
+            "wall_seconds": round(elapsed, 4),
+            "bytes": size,
+            "retries": retries
+        }
+        with self.lock:
+            self.calls.append(call)
+            stats = self._section(section)
+            stats["requests"] += 1
+            stats["bytes"] += size
+            stats["retries"] += retries
+
+    def summary(self) -> list:
+        """
+        Per-section rows for the report's timing table, slowest first.
+        """
+        with self.lock:
+            rows = [{"section": name, **stats} for name, stats in self.sections.items()]
+        return sorted(rows, key=lambda row: row["wall_seconds"], reverse=True)
+
+    def write(self, path: str = None, fmt: str = None) -> str | None:
+        """
+        Write the run to TELEMETRY_PATH: appended JSON lines ("jsonl") or an
+        OpenMetrics text file ("openmetrics", overwritten every run).
+
+        Returns:
+            The path written, or None when telemetry output is disabled.
+        """
+        path = path or TELEMETRY_PATH
+        fmt = fmt or TELEMETRY_FORMAT
+        if not path:
+            return None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if fmt == "openmetrics":
+            with open(path, "w") as f:
+                f.write(self.openmetrics())
+        else:
+            with open(path, "a") as f:
+                for line in self.json_lines():
+                    f.write(json.dumps(line, separators=(",", ":")) + "\n")
+        return path
+
+    def json_lines(self) -> list:
+        run = self.started_at.isoformat(timespec="seconds")
+        lines = [{"type": "section", "run": run, **row} for row in self.summary()]
+        with self.lock:
+            lines += [{"type": "http", "run": run, **call} for call in self.calls]
+        return lines
+
+    def openmetrics(self) -> str:
+        out = []
+
+        def metric(name, kind, help_text, samples):
+            out.append(f"# TYPE {name} {kind}")
+            out.append(f"# HELP {name} {help_text}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                suffix = "_total" if kind == "counter" else ""
+                out.append(f"{name}{suffix}{{{label_text}}} {value}")
+
+        rows = self.summary()
+        metric("moogsoft_report_section_seconds", "gauge", "Wall time of a report section.",
+               [({"section": r["section"]}, round(r["wall_seconds"], 4)) for r in rows])
+        metric("moogsoft_report_section_peak_rss_megabytes", "gauge", "Process peak RSS when the section finished.",
+               [({"section": r["section"]}, round(r["peak_rss_mb"], 1)) for r in rows])
+        for counter in _COUNTERS:
+            metric(f"moogsoft_report_section_{counter}", "counter", f"{counter.capitalize()} of a report section.",
+                   [({"section": r["section"]}, r[counter]) for r in rows])
+
+        per_endpoint = {}
+        with self.lock:
+            for call in self.calls:
+                totals = per_endpoint.setdefault(call["endpoint"], [0, 0.0])
+                totals[0] += 1
+                totals[1] += call["wall_seconds"]
+        out.append("# TYPE moogsoft_report_http_request_seconds summary")
+        out.append("# HELP moogsoft_report_http_request_seconds HTTP call wall time per endpoint, retries included.")
+        for endpoint, (count, total) in sorted(per_endpoint.items()):
+            out.append(f'moogsoft_report_http_request_seconds_count{{endpoint="{endpoint}"}} {count}')
+            out.append(f'moogsoft_report_http_request_seconds_sum{{endpoint="{endpoint}"}} {round(total, 4)}')
+
+        out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+
+_run = RunTelemetry()
+
+
+def start_run() -> RunTelemetry:
+    """
+    Start collecting a fresh run and return it.
+    """
+    global _run
+    _run = RunTelemetry()
+    return _run
+
+
+def current_run() -> RunTelemetry:
+    return _run
+
+
+def count(counter: str, amount: int = 1) -> None:
+    """
+    Add to a counter ("pages", "rows"...) of the current section.
+    """
+    _run.add(counter, amount)
+
+
+def record_call(method: str, url: str, endpoint: str | None, status: int | None,
+                elapsed: float, size: int, retries: int) -> None:
+    _run.record_call(method, url, endpoint, status, elapsed, size, retries)
+
+
+@contextmanager
+def section(name: str):
+    """
+    Attribute everything measured inside the block to the section `name`
+    and record its wall time.
+    """
+    token = current_section.set(name)
+    t0 = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        _run.finish_section(name, time.perf_counter() - t0, failed=failed)
+        current_section.reset(token)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024